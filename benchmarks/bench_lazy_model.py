@@ -0,0 +1,58 @@
+# -*- coding:utf-8 -*-
+'''
+Compare eager and lazy models when handlers only read a few fields.
+
+Usage: python benchmarks/bench_lazy_model.py
+'''
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import timeit
+
+from django_openapi.schema import (
+    BaseModel,
+    StringField,
+    NumberField,
+    ObjectField,
+    ArrayField,
+)
+
+
+class Item(BaseModel):
+    sku = StringField(regex=r'^[A-Z]{3}-[0-9]+$')
+    count = NumberField(gte=0)
+
+
+FIELDS = dict(('field_{}'.format(i), ArrayField(ObjectField(Item))) for i in range(50))
+FIELDS['uid'] = NumberField()
+
+EagerModel = type(str('EagerModel'), (BaseModel,), dict(FIELDS))
+LazyModel = type(
+    str('LazyModel'),
+    (BaseModel,),
+    dict(FIELDS, Config=type(str('Config'), (object,), {'lazy': True})),
+)
+
+PAYLOAD = dict(
+    ('field_{}'.format(i), [{'sku': 'ABC-1', 'count': 1}] * 10) for i in range(50)
+)
+PAYLOAD['uid'] = 1
+
+
+def handle(model_cls):
+    obj = model_cls(**PAYLOAD)
+    return obj.uid, obj.field_0
+
+
+def bench(label, fn, number):
+    best = min(timeit.repeat(fn, number=number, repeat=5))
+    print('{:<24} {:>10.2f} us/op'.format(label, best / number * 1e6))
+    return best
+
+
+if __name__ == '__main__':
+    eager = bench('eager', lambda: handle(EagerModel), 200)
+    lazy = bench('lazy', lambda: handle(LazyModel), 200)
+    print('{:<24} {:>10.2f}x'.format('speedup', eager / lazy))
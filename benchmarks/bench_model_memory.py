@@ -0,0 +1,53 @@
+# -*- coding:utf-8 -*-
+'''
+Compare memory used by regular and compact (slot based) model instances.
+
+Usage: python benchmarks/bench_model_memory.py (Python 3 only, uses tracemalloc)
+'''
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import gc
+import tracemalloc
+
+from django_openapi.schema import BaseModel, StringField, NumberField
+
+
+class UserModel(BaseModel):
+    uid = NumberField(gt=0, multiple_of=1)
+    first_name = StringField(min_length=1, max_length=50)
+    last_name = StringField(min_length=1, max_length=50)
+
+
+# derived from BaseModel directly, a non-compact base would bring __dict__ back
+class CompactUserModel(BaseModel):
+    class Config:
+        compact = True
+
+    uid = NumberField(gt=0, multiple_of=1)
+    first_name = StringField(min_length=1, max_length=50)
+    last_name = StringField(min_length=1, max_length=50)
+
+
+COUNT = 50000
+
+
+def measure(model_cls):
+    # share value objects between models, only instance overhead is measured
+    payload = dict(uid=1, first_name='toki', last_name='kanno')
+    gc.collect()
+    tracemalloc.start()
+    instances = [model_cls(**payload) for _ in range(COUNT)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert instances[-1].to_json_dict() == payload
+    return size / COUNT
+
+
+if __name__ == '__main__':
+    regular = measure(UserModel)
+    compact = measure(CompactUserModel)
+    print('{:<24} {:>10.1f} bytes/instance'.format('regular', regular))
+    print('{:<24} {:>10.1f} bytes/instance'.format('compact', compact))
+    print('{:<24} {:>10.1f}%'.format('reduction', (1 - compact / regular) * 100))
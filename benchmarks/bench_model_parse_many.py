@@ -0,0 +1,46 @@
+# -*- coding:utf-8 -*-
+'''
+Compare Model.parse_many() with parsing list items one by one.
+
+Usage: python benchmarks/bench_model_parse_many.py
+'''
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import timeit
+
+from django_openapi.schema import (
+    BaseModel,
+    StringField,
+    NumberField,
+    BooleanField,
+    ObjectField,
+)
+
+
+class ItemModel(BaseModel):
+    name = StringField(min_length=1, max_length=50)
+    kind = StringField(enums=['admin', 'user'])
+    age = NumberField(gte=0, lte=150, multiple_of=1)
+    active = BooleanField(default_value=False)
+
+
+ITEM_FIELD = ObjectField(ItemModel)
+PAYLOAD = [dict(name='toki', kind='user', age=30, active=True)] * 10000
+
+
+def parse_one_by_one():
+    return [ITEM_FIELD.parse(item, [idx]) for idx, item in enumerate(PAYLOAD)]
+
+
+def bench(label, fn, number):
+    best = min(timeit.repeat(fn, number=number, repeat=5))
+    print('{:<24} {:>10.2f} ms/op'.format(label, best / number * 1e3))
+    return best
+
+
+if __name__ == '__main__':
+    one_by_one = bench('one by one', parse_one_by_one, 10)
+    many = bench('parse_many', lambda: ITEM_FIELD.parse_many(PAYLOAD, []), 10)
+    print('{:<24} {:>10.2f}x'.format('speedup', one_by_one / many))
@@ -0,0 +1,70 @@
+# -*- coding:utf-8 -*-
+'''
+Compare compiled per-model serializers with the generic recursive to_json_value().
+
+Usage: python benchmarks/bench_model_serialization.py
+'''
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import timeit
+
+from django_openapi.schema import (
+    BaseModel,
+    StringField,
+    NumberField,
+    BooleanField,
+    ObjectField,
+    ArrayField,
+)
+from django_openapi.schema.base import to_json_value
+
+
+class UserModel(BaseModel):
+    uid = NumberField(gt=0, multiple_of=1)
+    first_name = StringField()
+    last_name = StringField()
+    active = BooleanField()
+    tags = ArrayField(StringField())
+
+
+class UserListModel(BaseModel):
+    users = ArrayField(ObjectField(UserModel))
+
+
+def generic_to_json_dict(obj):
+    # the former recursive BaseModel.to_json_dict()
+    json_d = {}
+    for k, v in obj._iter_value_items():
+        if isinstance(v, BaseModel):
+            json_d[k] = generic_to_json_dict(v)
+        elif isinstance(v, list):
+            json_d[k] = [
+                generic_to_json_dict(x) if isinstance(x, BaseModel) else to_json_value(x)
+                for x in v
+            ]
+        else:
+            json_d[k] = to_json_value(v)
+    return json_d
+
+
+USER_LIST = UserListModel(
+    users=[
+        dict(uid=i, first_name='toki', last_name='kanno', active=True, tags=['a', 'b'])
+        for i in range(1, 1001)
+    ]
+)
+
+
+def bench(label, fn, number):
+    best = min(timeit.repeat(fn, number=number, repeat=5))
+    print('{:<24} {:>10.2f} ms/op'.format(label, best / number * 1e3))
+    return best
+
+
+if __name__ == '__main__':
+    assert generic_to_json_dict(USER_LIST) == USER_LIST.to_json_dict()
+    generic = bench('1000 users generic', lambda: generic_to_json_dict(USER_LIST), 20)
+    compiled = bench('1000 users compiled', USER_LIST.to_json_dict, 20)
+    print('{:<24} {:>10.2f}x'.format('speedup', generic / compiled))
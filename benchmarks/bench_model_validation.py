@@ -0,0 +1,82 @@
+# -*- coding:utf-8 -*-
+'''
+Compare compiled per-model validators with the generic field.parse() loop.
+
+Usage: python benchmarks/bench_model_validation.py
+'''
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import timeit
+
+from django_openapi.schema import (
+    BaseModel,
+    StringField,
+    NumberField,
+    BooleanField,
+    ObjectField,
+    ArrayField,
+)
+
+
+class FlatModel(BaseModel):
+    first_name = StringField(min_length=1, max_length=50)
+    last_name = StringField(min_length=1, max_length=50)
+    kind = StringField(enums=['admin', 'user'])
+    age = NumberField(gte=0, lte=150, multiple_of=1)
+    score = NumberField(gt=0)
+    active = BooleanField(default_value=False)
+
+
+class NestedModel(BaseModel):
+    owner = ObjectField(FlatModel)
+    members = ArrayField(ObjectField(FlatModel))
+
+
+def generic_init(obj, kwargs):
+    # the former BaseModel.__init__ loop
+    processed_key_set = set()
+    for name, field in obj.iter_schema_fields():
+        value = kwargs.get(name, None)
+        position = [name]
+        value = field.parse(value, position)
+        setattr(obj, name, value)
+        processed_key_set.add(name)
+
+    for k, v in kwargs.items():
+        if k in processed_key_set:
+            continue
+        setattr(obj, k, v)
+
+
+class GenericFlatModel(FlatModel):
+    __init__ = lambda self, **kwargs: generic_init(self, kwargs)
+
+
+class GenericNestedModel(BaseModel):
+    owner = ObjectField(GenericFlatModel)
+    members = ArrayField(ObjectField(GenericFlatModel))
+    __init__ = lambda self, **kwargs: generic_init(self, kwargs)
+
+
+FLAT_PAYLOAD = dict(
+    first_name='toki', last_name='kanno', kind='user', age=30, score=4.5, active=True
+)
+NESTED_PAYLOAD = dict(owner=FLAT_PAYLOAD, members=[FLAT_PAYLOAD] * 20)
+
+
+def bench(label, fn, number):
+    best = min(timeit.repeat(fn, number=number, repeat=5))
+    print('{:<24} {:>10.2f} us/op'.format(label, best / number * 1e6))
+    return best
+
+
+if __name__ == '__main__':
+    for name, generic_cls, compiled_cls, payload, number in (
+        ('flat', GenericFlatModel, FlatModel, FLAT_PAYLOAD, 20000),
+        ('nested', GenericNestedModel, NestedModel, NESTED_PAYLOAD, 1000),
+    ):
+        generic = bench(name + ' generic', lambda: generic_cls(**payload), number)
+        compiled = bench(name + ' compiled', lambda: compiled_cls(**payload), number)
+        print('{:<24} {:>10.2f}x'.format(name + ' speedup', generic / compiled))
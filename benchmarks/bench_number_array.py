@@ -0,0 +1,34 @@
+# -*- coding:utf-8 -*-
+'''
+Compare NumPy vectorized number array validation with parsing items one by one.
+
+Usage: python benchmarks/bench_number_array.py (needs numpy)
+'''
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import random
+import timeit
+
+from django_openapi.schema import ArrayField, NumberField
+from django_openapi.schema.fields.utils import parse_items
+
+ITEM_FIELD = NumberField(gte=-1000, lte=1000, multiple_of=0.5)
+ARRAY_FIELD = ArrayField(ITEM_FIELD)
+NDARRAY_FIELD = ArrayField(ITEM_FIELD, as_ndarray=True)
+PAYLOAD = [random.randint(-2000, 2000) / 2 for _ in range(200000)]
+
+
+def bench(label, fn, number):
+    best = min(timeit.repeat(fn, number=number, repeat=5))
+    print('{:<24} {:>10.2f} ms/op'.format(label, best / number * 1e3))
+    return best
+
+
+if __name__ == '__main__':
+    one_by_one = bench('one by one', lambda: parse_items(ITEM_FIELD, PAYLOAD, []), 3)
+    vectorized = bench('vectorized', lambda: ARRAY_FIELD.parse(PAYLOAD, []), 3)
+    as_ndarray = bench('as_ndarray', lambda: NDARRAY_FIELD.parse(PAYLOAD, []), 3)
+    print('{:<24} {:>10.2f}x'.format('speedup', one_by_one / vectorized))
@@ -14,7 +14,7 @@ from django_openapi import OpenAPI, Path, Body, Query, Form, UploadFile
 from django_openapi.schema import (
     BaseModel,
     StringField,
-    NumberField,
+    IntegerField,
     ObjectField,
     ArrayField,
 )
@@ -39,7 +39,7 @@ api = OpenAPI(
 
 USER_STORE = OrderedDict()
 
-UID_FIELD = NumberField(gt=0, multiple_of=1)
+UID_FIELD = IntegerField(gt=0, int_format='int64')
 
 
 class CreateUserModel(BaseModel):
@@ -56,7 +56,7 @@ def get_users():
     return {'user': list(six.itervalues(USER_STORE))}
 
 
-@api.get('/users/{uid}', tags=['users'])
+@api.get('/users/{uid:int}', tags=['users'])
 def get_user_by_uid(uid=Path(UID_FIELD)):
     return {'user': USER_STORE.get(uid)}
 
@@ -64,7 +64,8 @@ def get_user_by_uid(uid=Path(UID_FIELD)):
 @api.post('/users', tags=['users'])
 def create_user(payload=Body(CreateUserModel)):
     uid = 1 if not USER_STORE else (max(six.iterkeys(USER_STORE)) + 1)
-    user = UserModel(
+    # payload is already validated, skip validating it again
+    user = UserModel.construct(
         uid=uid, first_name=payload.first_name, last_name=payload.last_name
     )
     USER_STORE[uid] = user
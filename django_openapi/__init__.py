@@ -1,2 +1,3 @@
 from .params import Query, Cookie, Header, Form, Body, UploadFile, Path
 from .api import OpenAPI
+from .router import APIRouter
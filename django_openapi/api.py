@@ -4,17 +4,30 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 from collections import OrderedDict
-
-import six
+from io import BytesIO
+import gzip
+import hashlib
+import json
+import os
 
 from django.conf.urls import url
+from django.core.serializers.json import DjangoJSONEncoder
 from django.views.decorators.csrf import csrf_exempt
-from django.http import HttpResponse, Http404, HttpResponseNotAllowed
-
-from .route import Route, PATH_NOT_FULL_FILLED
-from .schema import BaseModel
-
-from .utils import json_response
+from django.http import (
+    HttpResponse,
+    HttpResponseNotModified,
+    Http404,
+    HttpResponseNotAllowed,
+    HttpResponseRedirect,
+)
+from django.utils.http import parse_etags, urlencode
+
+from .route import Route
+from .route_tree import RouteTree
+from .router import BaseRouter
+from .schema.registry import SchemaRegistry
+
+from .utils import LRUCache
 
 DOC_PAGE_TPL = '''<!DOCTYPE html>
 <html>
@@ -29,7 +42,7 @@ DOC_PAGE_TPL = '''<!DOCTYPE html>
     <!-- `SwaggerUIBundle` is now available on the page -->
     <script>
     const ui = SwaggerUIBundle({{
-        url: '/{prefix_path}/_openapi.json',
+        url: '/{prefix_path}/_openapi.json{query_string}',
         oauth2RedirectUrl: window.location.origin + '/docs/oauth2-redirect',
         dom_id: '#swagger-ui',
         presets: [
@@ -65,7 +78,7 @@ REDOC_PAGE_TPL = '''
         </style>
     </head>
     <body>
-    <redoc spec-url='/{prefix_path}/_openapi.json'></redoc>
+    <redoc spec-url='/{prefix_path}/_openapi.json{query_string}'></redoc>
     <script src='https://cdn.jsdelivr.net/npm/redoc@next/bundles/redoc.standalone.js'> </script>
     </body>
 </html>'''
@@ -80,7 +93,7 @@ RAPIDOC_PAGE_TPL = '''
 </head>
 <body>
   <rapi-doc
-    spec-url="/{prefix_path}/_openapi.json"
+    spec-url="/{prefix_path}/_openapi.json{query_string}"
     sort-endpoints-by="method"
     render-style="read"
   > </rapi-doc>
@@ -88,8 +101,82 @@ RAPIDOC_PAGE_TPL = '''
 </html>
 '''
 
-
-class OpenAPI(object):
+DOC_PAGE_TPL_MAP = {
+    '/_docs': DOC_PAGE_TPL,
+    '/_redoc': REDOC_PAGE_TPL,
+    '/_rapidoc': RAPIDOC_PAGE_TPL,
+}
+
+# scripts & styles loaded by doc pages, could be vendored by openapi_export
+DOC_ASSET_URLS = (
+    'https://cdn.jsdelivr.net/npm/swagger-ui-dist@3/swagger-ui.css',
+    'https://cdn.jsdelivr.net/npm/swagger-ui-dist@3/swagger-ui-bundle.js',
+    'https://cdn.jsdelivr.net/npm/redoc@next/bundles/redoc.standalone.js',
+    'https://unpkg.com/rapidoc/dist/rapidoc-min.js',
+)
+
+
+def accepts_gzip(accept_encoding):
+    '''
+    Tell if Accept-Encoding header value allows gzip, by q-values of the
+    gzip entry, or of the '*' entry when gzip isn't listed.
+    '''
+    coding_q_map = {}
+    for item in accept_encoding.split(','):
+        parts = item.split(';')
+        coding = parts[0].strip().lower()
+        q = 1.0
+        for param in parts[1:]:
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        coding_q_map[coding] = q
+
+    q = coding_q_map.get('gzip', coding_q_map.get('*', 0.0))
+    return q > 0
+
+
+class EncodedSpec(object):
+    '''
+    UTF-8 encoded OpenAPI spec with its optional gzip variant and ETags.
+    '''
+
+    def __init__(self, body, with_gzip=True, gzip_body=None):
+        self.body = body
+        digest = hashlib.sha1(body).hexdigest()
+        self.etag = '"{}"'.format(digest)
+
+        self.gzip_body = self.gzip_etag = None
+        if with_gzip:
+            if gzip_body is None:
+                buf = BytesIO()
+                # fixed mtime for keeping gzip body stable
+                with gzip.GzipFile(fileobj=buf, mode='wb', mtime=0) as f:
+                    f.write(body)
+                gzip_body = buf.getvalue()
+            self.gzip_body = gzip_body
+            self.gzip_etag = '"{}-gzip"'.format(digest)
+
+    @classmethod
+    def from_file(cls, file_path, with_gzip=True):
+        '''
+        Load exported spec file, with its '.gz' variant if exists.
+        '''
+        with open(file_path, 'rb') as f:
+            body = f.read()
+
+        gzip_body = None
+        if with_gzip and os.path.exists(file_path + '.gz'):
+            with open(file_path + '.gz', 'rb') as f:
+                gzip_body = f.read()
+
+        return cls(body, with_gzip=with_gzip, gzip_body=gzip_body)
+
+
+class OpenAPI(BaseRouter):
     def __init__(
         self,
         title='OpenAPI',  # REQUIRED. The title of the API.
@@ -98,13 +185,40 @@ class OpenAPI(object):
         prefix_path='',
         server_url='',
         server_description='',
+        route_cache_size=0,  # max (method, path) resolved results kept in LRU cache
+        not_found_route_cache_size=0,  # max not found paths kept in LRU cache
+        response_validation='always',  # default response validation policy of routes
+        spec_cache_control='no-cache',  # Cache-Control header of /_openapi.json
+        spec_gzip=True,  # serve gzipped /_openapi.json to clients accepting it
+        filtered_spec_cache_size=32,  # max filtered specs kept in LRU cache
+        spec_file=None,  # serve pre-exported spec file in place of generated one
+        spec_url=None,  # redirect /_openapi.json to pre-exported spec URL
     ):
         self.title = title
         self.description = description
         self.version = version
         self.route_path_set = set()
         self.routes = []
+        self.route_cache = LRUCache(route_cache_size) if route_cache_size else None
+        self.not_found_route_cache = (
+            LRUCache(not_found_route_cache_size) if not_found_route_cache_size else None
+        )
+        self.route_tree = RouteTree(
+            route_cache=self.route_cache, not_found_cache=self.not_found_route_cache
+        )
         self.prefix_path = prefix_path.strip('/')
+        self.response_validation = response_validation
+        self.spec_cache_control = spec_cache_control
+        self.spec_gzip = spec_gzip
+        self.spec_file = spec_file
+        self.spec_url = spec_url
+        # schema components reachable from routes
+        self.schema_registry = SchemaRegistry()
+        # encoded spec, built on first request and dropped when routes added
+        self.spec_cache = None
+        self.filtered_spec_cache = (
+            LRUCache(filtered_spec_cache_size) if filtered_spec_cache_size else None
+        )
         self.server_info_d = {
             'url': server_url,
             'description': server_description,
@@ -119,6 +233,7 @@ class OpenAPI(object):
         tags=tuple(),
         response_model=None,
         response_model_map=None,
+        response_validation=None,
     ):
         def _decorator(fn):
             route = Route(
@@ -130,6 +245,11 @@ class OpenAPI(object):
                 tags=tags,
                 response_model=response_model,
                 response_model_map=response_model_map,
+                response_validation=(
+                    self.response_validation
+                    if response_validation is None
+                    else response_validation
+                ),
             )
 
             assert (
@@ -137,50 +257,36 @@ class OpenAPI(object):
             ), '{} already registered'.format(route_path)
 
             self.routes.append(route)
+            self.route_tree.add(route)
+            self.schema_registry.add_route(route)
+            self.spec_cache = None
+            if self.filtered_spec_cache is not None:
+                self.filtered_spec_cache.clear()
 
             return fn
 
         return _decorator
 
-    def get(
-        self,
-        route_path,
-        summary='',
-        description='',
-        tags=tuple(),
-        response_model=None,
-        response_model_map=None,
-    ):
-        return self.add_route(
-            route_path=route_path,
-            allow_methods=['GET'],
-            summary=summary,
-            description=description,
-            tags=tags,
-            response_model=response_model,
-            response_model_map=response_model_map,
-        )
+    def filter_routes(self, tags=None, path_prefix=None):
+        '''
+        Return routes having any of tags and path starting with path_prefix.
+        '''
+        routes = self.routes
+        if tags:
+            tag_set = set(tags)
+            routes = [r for r in routes if tag_set.intersection(r.tags)]
+        if path_prefix:
+            routes = [r for r in routes if r.route_path.startswith(path_prefix)]
+        return routes
+
+    def get_openapi_schema(self, tags=None, path_prefix=None):
+        '''
+        Return OpenAPI schema, limited to routes matching tags / path_prefix
+        and components referenced by them when any filter given.
+        '''
+        is_filtered = bool(tags or path_prefix)
+        routes = self.filter_routes(tags, path_prefix) if is_filtered else self.routes
 
-    def post(
-        self,
-        route_path,
-        summary='',
-        description='',
-        tags=tuple(),
-        response_model=None,
-        response_model_map=None,
-    ):
-        return self.add_route(
-            route_path=route_path,
-            allow_methods=['POST'],
-            summary=summary,
-            description=description,
-            tags=tags,
-            response_model=response_model,
-            response_model_map=response_model_map,
-        )
-
-    def get_openapi_schema(self):
         api_d = {
             'openapi': '3.0.2',
             'info': {
@@ -195,9 +301,10 @@ class OpenAPI(object):
 
         api_d['paths'] = path_d = OrderedDict()
 
-        for route_obj in self.routes:
+        for route_obj in routes:
             route_path = '/{prefix_path}{route_path}'.format(
-                prefix_path=self.prefix_path, route_path=route_obj.route_path
+                prefix_path=self.prefix_path,
+                route_path=route_obj.path_parser.openapi_path,
             )
 
             if route_path not in api_d['paths']:
@@ -205,10 +312,113 @@ class OpenAPI(object):
 
             api_d['paths'][route_path].update(route_obj.get_openapi_schema())
 
-        api_d['components'] = {'schemas': BaseModel.get_ref_name_to_schema_map()}
+        if is_filtered:
+            models = []
+            for route_obj in routes:
+                models.extend(route_obj.get_referenced_models())
+            schemas = self.schema_registry.get_schemas(models)
+        else:
+            schemas = self.schema_registry.snapshot
+
+        api_d['components'] = {'schemas': dict(schemas)}
 
         return api_d
 
+    def encode_openapi_spec(self, tags=None, path_prefix=None):
+        return EncodedSpec(
+            json.dumps(
+                self.get_openapi_schema(tags=tags, path_prefix=path_prefix),
+                cls=DjangoJSONEncoder,
+                separators=(',', ':'),
+            ).encode('utf-8'),
+            with_gzip=self.spec_gzip,
+        )
+
+    def get_openapi_spec_cache(self, tags=None, path_prefix=None):
+        '''
+        Return EncodedSpec of current OpenAPI schema, the schema is only
+        built and encoded again after routes changed.
+        '''
+        if tags or path_prefix:
+            if self.filtered_spec_cache is None:
+                return self.encode_openapi_spec(tags, path_prefix)
+
+            key = (tuple(sorted(set(tags or ()))), path_prefix or '')
+            spec_cache = self.filtered_spec_cache.get(key)
+            if spec_cache is None:
+                spec_cache = self.encode_openapi_spec(tags, path_prefix)
+                self.filtered_spec_cache.set(key, spec_cache)
+            return spec_cache
+
+        spec_cache = self.spec_cache
+        if spec_cache is None:
+            if self.spec_file:
+                spec_cache = EncodedSpec.from_file(
+                    self.spec_file, with_gzip=self.spec_gzip
+                )
+            else:
+                spec_cache = self.encode_openapi_spec()
+            self.spec_cache = spec_cache
+
+        return spec_cache
+
+    @staticmethod
+    def get_spec_filter(request):
+        '''
+        Return (tags, path_prefix) from ?tags=a,b&path_prefix=/admin query.
+        '''
+        tags = [tag.strip() for tag in request.GET.get('tags', '').split(',')]
+        tags = tuple(tag for tag in tags if tag)
+        path_prefix = request.GET.get('path_prefix', '')
+        return tags, path_prefix
+
+    @staticmethod
+    def get_spec_query_string(tags, path_prefix):
+        query_d = OrderedDict()
+        if tags:
+            query_d['tags'] = ','.join(tags)
+        if path_prefix:
+            query_d['path_prefix'] = path_prefix
+        return '?' + urlencode(query_d) if query_d else ''
+
+    def render_doc_page(self, route_path, query_string=''):
+        return DOC_PAGE_TPL_MAP[route_path].format(
+            title=self.title, prefix_path=self.prefix_path, query_string=query_string
+        )
+
+    def openapi_spec_response(self, request):
+        tags, path_prefix = self.get_spec_filter(request)
+        if self.spec_url and not (tags or path_prefix):
+            return HttpResponseRedirect(self.spec_url)
+
+        spec_cache = self.get_openapi_spec_cache(tags, path_prefix)
+
+        use_gzip = spec_cache.gzip_body is not None and accepts_gzip(
+            request.META.get('HTTP_ACCEPT_ENCODING', '')
+        )
+        etag = spec_cache.gzip_etag if use_gzip else spec_cache.etag
+
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match and (
+            etag in parse_etags(if_none_match) or if_none_match.strip() == '*'
+        ):
+            resp = HttpResponseNotModified()
+        else:
+            resp = HttpResponse(
+                spec_cache.gzip_body if use_gzip else spec_cache.body,
+                content_type='application/json',
+            )
+            if use_gzip:
+                resp['Content-Encoding'] = 'gzip'
+
+        resp['ETag'] = etag
+        if self.spec_cache_control:
+            resp['Cache-Control'] = self.spec_cache_control
+        if spec_cache.gzip_body is not None:
+            resp['Vary'] = 'Accept-Encoding'
+
+        return resp
+
     def as_django_url_pattern(self):
         return url(
             '^{prefix_path}(?P<route_path>/.*)'.format(prefix_path=self.prefix_path),
@@ -222,42 +432,30 @@ class OpenAPI(object):
 
             # document routes
             if route_path == '/_openapi.json':
-                return json_response(self.get_openapi_schema())
-            elif route_path == '/_docs':
-                return HttpResponse(
-                    DOC_PAGE_TPL.format(title=self.title, prefix_path=self.prefix_path)
-                )
-            elif route_path == '/_redoc':
+                return self.openapi_spec_response(request)
+            elif route_path in DOC_PAGE_TPL_MAP:
                 return HttpResponse(
-                    REDOC_PAGE_TPL.format(
-                        title=self.title, prefix_path=self.prefix_path
-                    )
-                )
-            elif route_path == '/_rapidoc':
-                return HttpResponse(
-                    RAPIDOC_PAGE_TPL.format(
-                        title=self.title, prefix_path=self.prefix_path
+                    self.render_doc_page(
+                        route_path,
+                        self.get_spec_query_string(*self.get_spec_filter(request)),
                     )
                 )
 
-            # find route handler from path_route_map
-            matched_route_to_path_kwargs_map = OrderedDict()
+            # find route handler from route tree
+            route, path_kwargs, allow_methods = self.route_tree.resolve(
+                request.method, route_path
+            )
 
-            for route in self.routes:
-                path_kwargs = route.match_path(route_path)
-                if path_kwargs is PATH_NOT_FULL_FILLED:
-                    continue
-                matched_route_to_path_kwargs_map[route] = path_kwargs
+            if route is None:
+                # not route matched
+                if not allow_methods:
+                    raise Http404
 
-            # not route matched
-            if not matched_route_to_path_kwargs_map:
-                raise Http404
+                return HttpResponseNotAllowed(allow_methods)
 
-            for route, path_kwargs in six.iteritems(matched_route_to_path_kwargs_map):
-                if request.method in route.allow_methods:
-                    request.path_kwargs = path_kwargs
-                    return route(request)
-            else:
-                raise HttpResponseNotAllowed
+            request.path_kwargs = path_kwargs
+            return route(request)
 
+        # for finding OpenAPI instances from urlpatterns, e.g. openapi_export
+        dispatcher.openapi = self
         return dispatcher
@@ -0,0 +1,127 @@
+# -*- coding:utf-8 -*-
+from __future__ import unicode_literals
+from __future__ import print_function
+
+import os
+import posixpath
+
+from django.core.management.base import BaseCommand, CommandError
+from six.moves.urllib.error import URLError
+from six.moves.urllib.request import urlopen
+
+try:
+    from django.urls import get_resolver
+except ImportError:  # django < 1.10
+    from django.core.urlresolvers import get_resolver
+
+from ...api import DOC_ASSET_URLS, DOC_PAGE_TPL_MAP, EncodedSpec
+
+SPEC_FILE_NAME = '_openapi.json'
+ASSET_DIR_NAME = '_assets'
+# seconds waiting for each doc asset download
+ASSET_DOWNLOAD_TIMEOUT = 30
+
+
+def find_openapi_instances(urlconf=None):
+    '''
+    Return OpenAPI instances mounted in urlpatterns of urlconf.
+    '''
+    apis = []
+    stack = list(reversed(get_resolver(urlconf).url_patterns))
+    while stack:
+        pattern = stack.pop()
+        sub_patterns = getattr(pattern, 'url_patterns', None)
+        if sub_patterns is not None:
+            stack.extend(reversed(sub_patterns))
+            continue
+
+        api = getattr(pattern.callback, 'openapi', None)
+        if api is not None and api not in apis:
+            apis.append(api)
+
+    return apis
+
+
+def write_file(file_path, content):
+    dir_path = os.path.dirname(file_path)
+    if not os.path.isdir(dir_path):
+        os.makedirs(dir_path)
+
+    with open(file_path, 'wb') as f:
+        f.write(content)
+
+
+class Command(BaseCommand):
+    help = (
+        'Export OpenAPI spec and doc pages of all OpenAPI instances in urlconf '
+        'into a directory, for serving them as static files.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('output_dir')
+        parser.add_argument(
+            '--urlconf', default=None, help='defaults to settings.ROOT_URLCONF'
+        )
+        parser.add_argument(
+            '--vendor-assets',
+            action='store_true',
+            help='download doc page scripts & styles into output dir',
+        )
+
+    def handle(self, output_dir, urlconf=None, vendor_assets=False, **options):
+        apis = find_openapi_instances(urlconf)
+        if not apis:
+            raise CommandError('no OpenAPI instance found in urlconf')
+
+        prefix_paths = [api.prefix_path for api in apis]
+        if len(set(prefix_paths)) != len(prefix_paths):
+            raise CommandError('OpenAPI instances with the same prefix_path')
+
+        asset_map = {}
+        if vendor_assets:
+            for asset_url in DOC_ASSET_URLS:
+                self.stdout.write('downloading {}'.format(asset_url))
+                try:
+                    resp = urlopen(asset_url, timeout=ASSET_DOWNLOAD_TIMEOUT)
+                    try:
+                        asset_map[asset_url] = resp.read()
+                    finally:
+                        resp.close()
+                except (URLError, IOError) as e:
+                    raise CommandError('fail downloading {}: {}'.format(asset_url, e))
+
+        for api in apis:
+            api_dir = os.path.join(output_dir, *api.prefix_path.split('/'))
+            self.export_openapi(api, api_dir, asset_map)
+            self.stdout.write(
+                'exported {} routes of {!r} into {}'.format(
+                    len(api.routes), api.title, api_dir
+                )
+            )
+
+    def export_openapi(self, api, api_dir, asset_map):
+        spec_cache = api.encode_openapi_spec()
+        if spec_cache.gzip_body is None:
+            spec_cache = EncodedSpec(spec_cache.body)
+
+        spec_path = os.path.join(api_dir, SPEC_FILE_NAME)
+        write_file(spec_path, spec_cache.body)
+        write_file(spec_path + '.gz', spec_cache.gzip_body)
+
+        asset_url_prefix = posixpath.join('/', api.prefix_path, ASSET_DIR_NAME)
+        for asset_url, content in asset_map.items():
+            asset_name = posixpath.basename(asset_url)
+            write_file(os.path.join(api_dir, ASSET_DIR_NAME, asset_name), content)
+
+        for route_path in DOC_PAGE_TPL_MAP:
+            html = api.render_doc_page(route_path)
+            for asset_url in asset_map:
+                html = html.replace(
+                    asset_url,
+                    posixpath.join(asset_url_prefix, posixpath.basename(asset_url)),
+                )
+
+            write_file(
+                os.path.join(api_dir, route_path.lstrip('/'), 'index.html'),
+                html.encode('utf-8'),
+            )
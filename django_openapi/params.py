@@ -12,6 +12,8 @@ from django.core.files.uploadedfile import UploadedFile
 from .schema.fields import BaseSchemaElement, StringField
 from .schema import BaseModel
 from .schema.fields.exceptions import SchemaValidationError
+from .schema.fields.utils import check_payload_size
+from .utils import RECURSION_ERRORS, is_recursion_error
 
 _NOT_SET = object()
 
@@ -35,6 +37,9 @@ class BaseRequestParam(six.with_metaclass(ABCMeta, object)):
     def parse(self, request, name):
         pass
 
+    def get_referenced_models(self):
+        return ()
+
 
 class BaseRequestField(BaseRequestParam):
     def __init__(self, field=None):
@@ -64,6 +69,9 @@ class BaseRequestField(BaseRequestParam):
 
         return schema_d
 
+    def get_referenced_models(self):
+        return self.field.get_referenced_models()
+
     def parse(self, request, name):
         return self.field.parse(
             self.get_value_from_request(request, name), [self.IN_POS, name]
@@ -75,6 +83,9 @@ class BaseRequestBodyModel(BaseRequestParam):
         assert isinstance(model_cls, type) and issubclass(model_cls, BaseModel)
         self.model_cls = model_cls
 
+    def get_referenced_models(self):
+        return (self.model_cls,)
+
     def get_openapi_schema(self):
         schema_d = {
             'content': {
@@ -92,17 +103,40 @@ class BaseRequestBodyModel(BaseRequestParam):
 
     def parse(self, request, name):
         try:
-            return self.model_cls(**self.get_value_from_request(request, name))
+            obj = self.model_cls(**self.get_value_from_request(request, name))
         except SchemaValidationError as e:
             e.position = [self.IN_POS, name] + e.position
             raise e
 
+        if self.model_cls._config['lazy']:
+            obj.bind_lazy_position([self.IN_POS, name])
+
+        return obj
+
 
 class Body(BaseRequestBodyModel):
     IN_POS = 'body'
 
+    def __init__(self, model_cls, max_depth=None, max_nodes=None):
+        super(Body, self).__init__(model_cls)
+        # limits of decoded JSON body, checked before validation
+        self.max_depth = max_depth
+        self.max_nodes = max_nodes
+
     def get_value_from_request(self, request, name):
-        return json.loads(six.ensure_text(request.body))
+        try:
+            value = json.loads(six.ensure_text(request.body))
+        except RECURSION_ERRORS as e:
+            if not is_recursion_error(e):
+                raise
+            raise SchemaValidationError(
+                None, 'PAYLOAD_TOO_DEEP', constraint=self.max_depth
+            )
+
+        if self.max_depth is not None or self.max_nodes is not None:
+            check_payload_size(value, [], self.max_depth, self.max_nodes)
+
+        return value
 
 
 class Query(BaseRequestField):
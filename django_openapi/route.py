@@ -15,16 +15,22 @@ except (AttributeError, ImportError):
 # from inspect import getargspec
 from string import Formatter
 from collections import OrderedDict
+from numbers import Real
+from random import random
+import logging
 import re
 
 from django.http import HttpResponse
 
-from .utils import json_response
+from .utils import json_response, RECURSION_ERRORS, is_recursion_error
 from .params import BaseRequestParam
 from .cookie import CookieJar
+from .schema.base import to_json_value
+from .schema.fields.exceptions import DeferredSchemaValidationError
 from .schema import (
     BaseModel,
     StringField,
+    NumberField,
     ArrayField,
     ObjectField,
     SchemaValidationError,
@@ -34,6 +40,9 @@ from collections import Counter
 
 import six
 
+logger = logging.getLogger(__name__)
+
+RESPONSE_VALIDATION_POLICY_SET = {'always', 'never'}
 
 ALLOW_HTTP_METHOD_SET = {
     'GET',
@@ -70,6 +79,20 @@ class PathNotFullfilled(Exception):
 
 PATH_NOT_FULL_FILLED = object()
 
+PATH_PARAM_PATTERN = '([^/]+)'
+
+# converter name -> (regex, python value convert function)
+PATH_CONVERTER_MAP = {
+    'str': (r'[^/]+', None),
+    'slug': (r'[-a-zA-Z0-9_]+', None),
+    # bounded for not converting huge digit strings, e.g. int() limit of python 3.11+
+    'int': (r'[0-9]{1,19}', int),
+    'uuid': (
+        r'[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}',
+        lambda value: value.lower(),
+    ),
+}
+
 
 class RoutePath(object):
     def __init__(self, route_path):
@@ -81,22 +104,70 @@ class RoutePath(object):
         self.route_path = route_path[:-1] if route_path.endswith('/') else route_path
 
         self.key_set = set()
+        self.key_to_converter_name_map = {}
+        self.key_to_convert_fn_map = {}
         re_segs = []
+        openapi_path_segs = []
         fmt = Formatter()
         for prefix, key, fmt_spec, conversion in fmt.parse(self.route_path):
+            openapi_path_segs.append(prefix)
             if key is None:
-                re_segs.append(prefix)
+                re_segs.append(re.escape(prefix))
                 continue
 
-            assert key and not fmt_spec and not conversion, (
+            assert key and not conversion, (
                 'fail parsing parameter from path: ' + self.route_path
             )
             assert key not in self.key_set, 'duplicated key {}'.format(key)
+            converter_name = fmt_spec or 'str'
+            assert (
+                converter_name in PATH_CONVERTER_MAP
+            ), 'unknown path converter {}'.format(converter_name)
+
             self.key_set.add(key)
-            re_segs.append('{prefix}(?P<{key}>[^/]+)'.format(prefix=prefix, key=key))
+            self.key_to_converter_name_map[key] = converter_name
+            key_regex, convert_fn = PATH_CONVERTER_MAP[converter_name]
+            if convert_fn:
+                self.key_to_convert_fn_map[key] = convert_fn
+
+            re_segs.append(
+                '{prefix}(?P<{key}>{key_regex})'.format(
+                    prefix=re.escape(prefix), key=key, key_regex=key_regex
+                )
+            )
+            openapi_path_segs.append('{' + key + '}')
 
         # print('regex: ' + ''.join(re_segs))
-        self.regex = re.compile('^' + ''.join(re_segs) + '$')
+        self.regex = re.compile('^' + ''.join(re_segs) + r'\Z')
+        # path template without converters, for OpenAPI document
+        self.openapi_path = ''.join(openapi_path_segs)
+
+        # per segment (pattern, keys) pairs, used for building route tree,
+        # static segment has empty keys and its pattern is the literal text
+        self.segments = []
+        for seg in self.route_path.split('/')[1:]:
+            keys = []
+            prefixes = []
+            seg_re_segs = []
+            for prefix, key, fmt_spec, conversion in fmt.parse(seg):
+                prefixes.append(prefix)
+                seg_re_segs.append(re.escape(prefix))
+                if key is not None:
+                    keys.append(key)
+                    seg_re_segs.append(
+                        '(' + PATH_CONVERTER_MAP[fmt_spec or 'str'][0] + ')'
+                    )
+
+            if keys:
+                self.segments.append((''.join(seg_re_segs), tuple(keys)))
+            else:
+                self.segments.append((''.join(prefixes), tuple()))
+
+    def to_python(self, path_kwargs):
+        for key, convert_fn in six.iteritems(self.key_to_convert_fn_map):
+            path_kwargs[key] = convert_fn(path_kwargs[key])
+
+        return path_kwargs
 
     def parse(self, request_path):
         if not request_path.startswith('/'):
@@ -106,7 +177,7 @@ class RoutePath(object):
         if not match:
             return PATH_NOT_FULL_FILLED
 
-        return match.groupdict()
+        return self.to_python(match.groupdict())
 
 
 class Route(object):
@@ -120,6 +191,7 @@ class Route(object):
         tags=tuple(),
         response_model=None,
         response_model_map=None,
+        response_validation='always',
     ):
         description = description or fn.__doc__
 
@@ -158,6 +230,16 @@ class Route(object):
                 ), 'Must be OpenAPI BaseModel'
                 response_model_map[k] = v
 
+        # 'always', 'never' or sample rate between 0 ~ 1 for dict responses
+        assert response_validation in RESPONSE_VALIDATION_POLICY_SET or (
+            isinstance(response_validation, Real)
+            and not isinstance(response_validation, bool)
+            and 0 <= response_validation <= 1
+        ), 'bad response validation policy {}'.format(response_validation)
+        self.response_validation = response_validation
+        self.response_validation_count = 0
+        self.response_validation_error_count = 0
+
         self.arg_type_counter = Counter()
         self.arg_name_to_request_param_map = OrderedDict()
         self.pass_request = False
@@ -203,6 +285,13 @@ class Route(object):
                     and self.arg_name_to_request_param_map[k].IN_POS == 'path'
                 ), 'umapped path arg key {}'.format(k)
 
+                if self.path_parser.key_to_converter_name_map[k] == 'int':
+                    assert isinstance(
+                        self.arg_name_to_request_param_map[k].field, NumberField
+                    ), 'path arg key {} with int converter must be NumberField'.format(
+                        k
+                    )
+
         assert (
             self.arg_type_counter['body'] <= 1
         ), 'can only has single Body param in same route'
@@ -213,6 +302,50 @@ class Route(object):
 
         self.fn = fn
 
+    def get_body_form_cls(self):
+        '''
+        Return model of form params for documenting them as request body,
+        or None if there is no form param or body param already.
+        '''
+        if self._body_form_cls is None:
+            form_param_d = OrderedDict()
+            for name, param in six.iteritems(self.arg_name_to_request_param_map):
+                if param.IN_POS == 'body':
+                    return None
+                if param.IN_POS == 'form':
+                    form_param_d[name] = param.field
+
+            if not form_param_d:
+                return None
+
+            self._body_form_cls = type(
+                six.ensure_str(
+                    '{route_path}_body_form'.format(
+                        route_path=self.route_path.replace('/', '_')
+                    )
+                ),
+                (BaseModel,),
+                form_param_d,
+            )
+
+        return self._body_form_cls
+
+    def get_referenced_models(self):
+        '''
+        Return models referenced by params and responses of this route.
+        '''
+        models = []
+        for param in six.itervalues(self.arg_name_to_request_param_map):
+            models.extend(param.get_referenced_models())
+
+        body_form_cls = self.get_body_form_cls()
+        if body_form_cls is not None:
+            models.append(body_form_cls)
+
+        models.extend(six.itervalues(self.response_map))
+
+        return list(OrderedDict.fromkeys(models))
+
     def get_openapi_schema(self):
         route_d = {}
 
@@ -223,40 +356,26 @@ class Route(object):
         if self.tags:
             route_d['tags'] = self.tags
 
-        form_param_d = OrderedDict()
         parameters = []
         for name, param in six.iteritems(self.arg_name_to_request_param_map):
             if param.IN_POS == 'body':
                 route_d['requestBody'] = param.get_openapi_schema()
 
-            elif param.IN_POS == 'form':
-                form_param_d[name] = param.field
-
-            else:
+            elif param.IN_POS != 'form':
                 parameters.append(param.get_openapi_schema(name))
 
         if parameters:
             route_d['parameters'] = parameters
 
-        if form_param_d and 'requestBody' not in route_d:
-            if self._body_form_cls is None:
-                self._body_form_cls = type(
-                    six.ensure_str(
-                        '{route_path}_body_form'.format(
-                            route_path=self.route_path.replace('/', '_')
-                        )
-                    ),
-                    (BaseModel,),
-                    form_param_d,
-                )
-
+        body_form_cls = self.get_body_form_cls()
+        if body_form_cls is not None:
             route_d['requestBody'] = {
                 'content': {
                     'multipart/form-data': {
                         # 'application/x-www-form-urlencoded': {
                         'schema': {
                             '$ref': '#/components/schemas/'
-                            + self._body_form_cls.get_json_schema_ref()
+                            + body_form_cls.get_json_schema_ref()
                         }
                     }
                 }
@@ -283,6 +402,30 @@ class Route(object):
     def match_path(self, request_path):
         return self.path_parser.parse(request_path)
 
+    def _should_validate_response(self):
+        if self.response_validation == 'always':
+            return True
+
+        if self.response_validation == 'never':
+            return False
+
+        if random() >= self.response_validation:
+            return False
+
+        self.response_validation_count += 1
+        return True
+
+    @staticmethod
+    def _validate_response(resp_model_cls, resp):
+        resp = resp_model_cls(**resp)
+        if resp_model_cls._config['lazy']:
+            # response errors are server side, never raise them as deferred
+            try:
+                resp.resolve_lazy_fields()
+            except DeferredSchemaValidationError as e:
+                raise e.error
+        return resp
+
     def prase_response(self, resp, http_status_code=200):
 
         resp = resp or {}  # default empty dict response
@@ -292,11 +435,32 @@ class Route(object):
             return resp
 
         if isinstance(resp, dict):
-            if resp_model_cls:
-                resp = resp_model_cls(**resp)
-            else:
+            if not resp_model_cls:
                 return json_response(resp)
 
+            # default model of any object, nothing to validate
+            if resp_model_cls is BaseModel:
+                return json_response(to_json_value(resp))
+
+            if not self._should_validate_response():
+                return json_response(to_json_value(resp))
+
+            if self.response_validation == 'always':
+                resp = self._validate_response(resp_model_cls, resp)
+            else:
+                try:
+                    resp = self._validate_response(resp_model_cls, resp)
+                except SchemaValidationError as e:
+                    # sampled validation never fails the request
+                    self.response_validation_error_count += 1
+                    logger.warning(
+                        'response of %s mismatches %s: %r',
+                        self.route_path,
+                        resp_model_cls.__name__,
+                        e,
+                    )
+                    return json_response(to_json_value(resp))
+
         if isinstance(resp, BaseModel) and (
             not resp_model_cls or isinstance(resp, resp_model_cls)
         ):
@@ -306,6 +470,30 @@ class Route(object):
             'unable to process resp of {route_path}'.format(route_path=self.route_path)
         )
 
+    def _is_request_error(self, error):
+        '''
+        Tell if deferred error is raised by lazy models of request params,
+        which are bound to [IN_POS, param name] positions.
+        '''
+        position = error.position
+        if len(position) < 2:
+            return False
+
+        param = self.arg_name_to_request_param_map.get(position[1])
+        return param is not None and param.IN_POS == position[0]
+
+    def validation_error_response(self, validation_errors):
+        return json_response(
+            {
+                'detail': [
+                    {'loc': err.position, 'type': err.err_type, 'msg': err.err_type}
+                    for error in validation_errors
+                    for err in error.flatten()
+                ]
+            },
+            status_code=422,
+        )
+
     def __call__(self, request):
         kwargs = {}
 
@@ -324,24 +512,27 @@ class Route(object):
                 kwargs[k] = field.parse(request, k)
             except SchemaValidationError as e:
                 validation_errors.append(e)
+            except RECURSION_ERRORS as e:
+                if not is_recursion_error(e):
+                    raise
+                validation_errors.append(
+                    SchemaValidationError(
+                        None, 'PAYLOAD_TOO_DEEP', position=[field.IN_POS, k]
+                    )
+                )
 
         if validation_errors:
-            return json_response(
-                {
-                    'detail': [
-                        {
-                            'loc': err.position,
-                            'type': err.err_type,
-                            'msg': err.err_type,
-                        }
-                        for err in validation_errors
-                    ]
-                },
-                status_code=422,
-            )
-
-        resp = self.fn(**kwargs)
-        resp = self.prase_response(resp)
+            return self.validation_error_response(validation_errors)
+
+        try:
+            resp = self.fn(**kwargs)
+            resp = self.prase_response(resp)
+        except DeferredSchemaValidationError as e:
+            # request data found invalid later by lazy models, e.g. a lazy
+            # body model returned as response without being read
+            if not self._is_request_error(e):
+                raise
+            return self.validation_error_response([e])
 
         if self.pass_cookie_jar:
             kwargs['cookie_jar'].apply_to_response(resp)
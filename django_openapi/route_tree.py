@@ -0,0 +1,261 @@
+# -*- coding:utf-8 -*-
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+from collections import OrderedDict
+import re
+
+import six
+
+from .route import PATH_PARAM_PATTERN
+
+_NOT_FOUND = (None, None, tuple())
+
+
+class RouteTreeNode(object):
+    __slots__ = (
+        'static_children',
+        'dynamic_children',
+        'entries',
+        'method_entry_map',
+        'allow_methods',
+    )
+
+    def __init__(self):
+        # segment text -> child node
+        self.static_children = {}
+        # segment pattern -> (compiled regex or None, child node)
+        self.dynamic_children = OrderedDict()
+        # list of (register order, route, path keys) terminated at this node
+        self.entries = []
+        # http method -> first registered entry allowing it
+        self.method_entry_map = {}
+        # sorted tuple of http methods allowed by entries
+        self.allow_methods = tuple()
+
+
+class RouteTree(object):
+    '''
+    Segment based radix tree for resolving request path into routes.
+
+    Static segments are resolved by dict lookup and parameter segments by
+    wildcard edges, so resolving cost depends on path depth rather than the
+    number of registered routes.
+
+    Paths of parameter-free routes are also kept in an exact match table,
+    so resolving them only costs a single dict lookup. Table entries are
+    built on first lookup, so registering routes stays linear.
+
+    Optional LRU caches could be given for memorizing resolved results of
+    parameterized paths. Not found paths are only cached in their own
+    not_found_cache and method not allowed results are never cached, so
+    scanning arbitrary paths or methods won't flush route_cache.
+    '''
+
+    def __init__(self, route_cache=None, not_found_cache=None):
+        self.root = RouteTreeNode()
+        self.route_count = 0
+        # normalized paths of parameter-free routes
+        self.static_path_set = set()
+        # normalized static path -> (method to (route, path_kwargs) map, allow methods)
+        self.static_path_map = {}
+        # (method, request path) -> (route, path_kwargs, allow_methods)
+        self.route_cache = route_cache
+        # request path -> True
+        self.not_found_cache = not_found_cache
+
+    def add(self, route):
+        node = self.root
+        path_keys = []
+
+        for pattern, keys in route.path_parser.segments:
+            if not keys:
+                child = node.static_children.get(pattern)
+                if child is None:
+                    child = node.static_children[pattern] = RouteTreeNode()
+                node = child
+                continue
+
+            edge = node.dynamic_children.get(pattern)
+            if edge is None:
+                # plain `{key}` segment matches any non-empty text, no regex needed
+                regex = (
+                    None
+                    if pattern == PATH_PARAM_PATTERN
+                    else re.compile('(?:' + pattern + r')\Z')
+                )
+                edge = node.dynamic_children[pattern] = (regex, RouteTreeNode())
+
+            node = edge[1]
+            path_keys.extend(keys)
+
+        entry = (self.route_count, route, tuple(path_keys))
+        self.route_count += 1
+
+        if self.route_cache is not None:
+            self.route_cache.clear()
+        if self.not_found_cache is not None:
+            self.not_found_cache.clear()
+
+        node.entries.append(entry)
+        for method in route.allow_methods:
+            node.method_entry_map.setdefault(method, entry)
+        node.allow_methods = tuple(
+            sorted(set(node.allow_methods) | set(route.allow_methods))
+        )
+
+        if not path_keys:
+            static_path = '/' + '/'.join(
+                pattern for pattern, _ in route.path_parser.segments
+            )
+            self.static_path_set.add(static_path)
+            self.static_path_map.pop(static_path, None)
+        else:
+            # parameterized route may also match registered static paths,
+            # drop built entries for keeping the register order priority
+            self.static_path_map = {}
+
+    def _build_static_path_item(self, static_path):
+        method_to_route_pair_map = {}
+        allow_method_set = set()
+
+        for route, path_kwargs in self.match(static_path):
+            for method in route.allow_methods:
+                method_to_route_pair_map.setdefault(method, (route, path_kwargs))
+            allow_method_set.update(route.allow_methods)
+
+        return method_to_route_pair_map, tuple(sorted(allow_method_set))
+
+    def resolve(self, method, request_path):
+        '''
+        Return (route, path_kwargs, allow_methods) for a request.
+
+        route is the first registered one matching both method and
+        request_path. If no route could handle the method, route is None and
+        allow_methods holds the methods allowed on request_path, which is
+        empty when nothing matched the path at all.
+
+        path_kwargs is a new dict on every call, cached ones are never
+        handed out, so callers are free to mutate it.
+        '''
+        if not request_path.startswith('/'):
+            request_path = '/' + request_path
+
+        static_path_item = self.static_path_map.get(request_path)
+        if static_path_item is None and request_path in self.static_path_set:
+            static_path_item = self._build_static_path_item(request_path)
+            self.static_path_map[request_path] = static_path_item
+
+        if static_path_item is not None:
+            route_pair = static_path_item[0].get(method)
+            if route_pair is not None:
+                return route_pair[0], dict(route_pair[1]), tuple()
+            return None, None, static_path_item[1]
+
+        if self.route_cache is not None:
+            resolved = self.route_cache.get((method, request_path))
+            if resolved is not None:
+                return resolved[0], dict(resolved[1]), resolved[2]
+
+        if self.not_found_cache is not None and self.not_found_cache.get(request_path):
+            return _NOT_FOUND
+
+        resolved = self._resolve(method, request_path)
+
+        if resolved[0] is not None:
+            if self.route_cache is not None:
+                self.route_cache.set(
+                    (method, request_path),
+                    (resolved[0], dict(resolved[1]), resolved[2]),
+                )
+        elif not resolved[2]:
+            if self.not_found_cache is not None:
+                self.not_found_cache.set(request_path, True)
+
+        return resolved
+
+    def _resolve(self, method, request_path):
+        node_values_pairs = []
+        self._collect(self.root, request_path.split('/')[1:], 0, [], node_values_pairs)
+
+        best_entry = best_values = None
+        for node, values in node_values_pairs:
+            entry = node.method_entry_map.get(method)
+            if entry is not None and (best_entry is None or entry[0] < best_entry[0]):
+                best_entry, best_values = entry, values
+
+        if best_entry is not None:
+            route = best_entry[1]
+            return (
+                route,
+                route.path_parser.to_python(
+                    dict(six.moves.zip(best_entry[2], best_values))
+                ),
+                tuple(),
+            )
+
+        if len(node_values_pairs) == 1:
+            return None, None, node_values_pairs[0][0].allow_methods
+
+        allow_method_set = set()
+        for node, _ in node_values_pairs:
+            allow_method_set.update(node.allow_methods)
+        return None, None, tuple(sorted(allow_method_set))
+
+    def match(self, request_path):
+        '''
+        Return list of (route, path_kwargs) matched with request_path,
+        ordered by route register order (first registered first).
+        '''
+        if not request_path.startswith('/'):
+            request_path = '/' + request_path
+
+        node_values_pairs = []
+        self._collect(self.root, request_path.split('/')[1:], 0, [], node_values_pairs)
+
+        entry_values_pairs = [
+            (entry, values)
+            for node, values in node_values_pairs
+            for entry in node.entries
+        ]
+        if len(entry_values_pairs) > 1:
+            entry_values_pairs.sort(key=lambda pair: pair[0][0])
+
+        return [
+            (
+                entry[1],
+                entry[1].path_parser.to_python(dict(six.moves.zip(entry[2], values))),
+            )
+            for entry, values in entry_values_pairs
+        ]
+
+    def _collect(self, node, segs, idx, values, node_values_pairs):
+        if idx == len(segs):
+            if node.entries:
+                node_values_pairs.append((node, values))
+            return
+
+        seg = segs[idx]
+
+        child = node.static_children.get(seg)
+        if child is not None:
+            self._collect(child, segs, idx + 1, values, node_values_pairs)
+
+        if not seg:
+            return
+
+        for regex, child in six.itervalues(node.dynamic_children):
+            if regex is None:
+                self._collect(child, segs, idx + 1, values + [seg], node_values_pairs)
+                continue
+
+            match = regex.match(seg)
+            if match:
+                self._collect(
+                    child,
+                    segs,
+                    idx + 1,
+                    values + list(match.groups()),
+                    node_values_pairs,
+                )
@@ -0,0 +1,128 @@
+# -*- coding:utf-8 -*-
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+from abc import ABCMeta, abstractmethod
+
+import six
+
+
+class BaseRouter(six.with_metaclass(ABCMeta, object)):
+    @abstractmethod
+    def add_route(
+        self,
+        route_path,
+        allow_methods=tuple(),
+        summary='',
+        description='',
+        tags=tuple(),
+        response_model=None,
+        response_model_map=None,
+        response_validation=None,
+    ):
+        pass
+
+    def get(
+        self,
+        route_path,
+        summary='',
+        description='',
+        tags=tuple(),
+        response_model=None,
+        response_model_map=None,
+        response_validation=None,
+    ):
+        return self.add_route(
+            route_path=route_path,
+            allow_methods=['GET'],
+            summary=summary,
+            description=description,
+            tags=tags,
+            response_model=response_model,
+            response_model_map=response_model_map,
+            response_validation=response_validation,
+        )
+
+    def post(
+        self,
+        route_path,
+        summary='',
+        description='',
+        tags=tuple(),
+        response_model=None,
+        response_model_map=None,
+        response_validation=None,
+    ):
+        return self.add_route(
+            route_path=route_path,
+            allow_methods=['POST'],
+            summary=summary,
+            description=description,
+            tags=tags,
+            response_model=response_model,
+            response_model_map=response_model_map,
+            response_validation=response_validation,
+        )
+
+    def include_router(self, router, prefix='', tags=tuple()):
+        '''
+        Register all routes collected by router, with route paths prefixed by
+        prefix and tags prepended to their own tags.
+        '''
+        assert isinstance(router, APIRouter), 'Must be APIRouter'
+
+        prefix = prefix.strip('/')
+        prefix = '/' + prefix if prefix else ''
+
+        for route_path, route_kwargs, fn in router.route_defs:
+            route_kwargs = dict(route_kwargs)
+            route_kwargs['tags'] = list(tags) + [
+                tag for tag in (route_kwargs['tags'] or []) if tag not in tags
+            ]
+            self.add_route(prefix + route_path, **route_kwargs)(fn)
+
+
+class APIRouter(BaseRouter):
+    '''
+    Collects route registrations without serving them.
+
+    Routes are flattened into an OpenAPI instance (or another APIRouter) via
+    include_router(), so they share its single url pattern, route tree and
+    OpenAPI document.
+    '''
+
+    def __init__(self):
+        self.route_defs = []
+
+    def add_route(
+        self,
+        route_path,
+        allow_methods=tuple(),
+        summary='',
+        description='',
+        tags=tuple(),
+        response_model=None,
+        response_model_map=None,
+        response_validation=None,
+    ):
+        def _decorator(fn):
+            self.route_defs.append(
+                (
+                    route_path,
+                    dict(
+                        allow_methods=allow_methods,
+                        summary=summary,
+                        description=description,
+                        tags=tags,
+                        response_model=response_model,
+                        response_model_map=response_model_map,
+                        response_validation=response_validation,
+                    ),
+                    fn,
+                )
+            )
+
+            return fn
+
+        return _decorator
@@ -1,3 +1,15 @@
 from .base import BaseModel
-from .fields import StringField, BooleanField, NumberField, ObjectField, ArrayField
-from .fields.exceptions import SchemaValidationError
+from .fields import (
+    StringField,
+    BooleanField,
+    NumberField,
+    IntegerField,
+    ObjectField,
+    ArrayField,
+    UnionField,
+    DateTimeField,
+    DateField,
+    UUIDField,
+    DecimalField,
+)
+from .fields.exceptions import SchemaValidationError, MultipleSchemaValidationError
@@ -3,111 +3,575 @@ from __future__ import unicode_literals
 from __future__ import print_function
 
 from copy import copy
+from itertools import repeat
+from datetime import datetime, date
+from decimal import Decimal
+from uuid import UUID
 from abc import ABCMeta, abstractmethod
 from collections import OrderedDict, Iterable, Mapping
+from threading import RLock
 
 import six
+from django.core.serializers.json import DjangoJSONEncoder
 
 from .fields import BaseSchemaElement
+from .fields.constants import NO_DEFULAT_VALUE
+from .fields.exceptions import SchemaValidationError
 from .fields.utils import is_iterable
+from .fields.vectorize import ndarray_type
+from .fields.exceptions import DeferredSchemaValidationError
+from .codegen import (
+    compile_validator,
+    compile_serializer,
+    get_deferred_type_check,
+    LAZY_STATE_NAME,
+    LazyState,
+)
 
 _model_to_ref_name_map = {}
 _ref_name_to_schema_map = {}
+_ref_name_lock = RLock()
 
+_NOT_SET = object()
 
-class BaseModel(object):
-    def __init__(self, *args, **kwargs):
-        processed_key_set = set()
+JSON_PRIMITIVE_TYPE_SET = frozenset(
+    [type(None), bool, float, six.text_type, six.binary_type]
+    + list(six.integer_types)
+    + list(six.string_types)
+)
 
-        # load from scdhemas
-        for name, field in self.iter_schema_fields():
-            value = kwargs.get(name, None)
 
-            position = [name]
-            value = field.parse(value, position)
+_django_json_default = DjangoJSONEncoder().default
 
-            setattr(self, name, value)
-            processed_key_set.add(name)
+# values of format fields, serialized as text the same way as JsonResponse does
+JSON_TEXT_CONVERTER_MAP = {
+    datetime: _django_json_default,
+    date: _django_json_default,
+    UUID: _django_json_default,
+    Decimal: _django_json_default,
+}
+
+
+# nesting levels converted by recursion, deeper values go through explicit stack
+_RECURSIVE_JSON_DEPTH = 32
+
+
+def to_json_value(v, _depth=0):
+    '''
+    Convert v into JSON compatible value. Values nested deeper than
+    _RECURSIVE_JSON_DEPTH levels are walked by an explicit stack, so deep
+    values can't exhaust the recursion limit.
+    '''
+    value_type = type(v)
+    if value_type in JSON_PRIMITIVE_TYPE_SET:
+        return v
+
+    elif value_type in JSON_TEXT_CONVERTER_MAP:
+        return JSON_TEXT_CONVERTER_MAP[value_type](v)
+
+    elif isinstance(v, BaseModel):
+        return v.to_json_dict()
+
+    elif isinstance(v, Mapping):
+        if _depth >= _RECURSIVE_JSON_DEPTH:
+            return _to_json_value_by_stack(v)
+        _depth += 1
+        return {_k: to_json_value(_v, _depth) for _k, _v in six.iteritems(v)}
+
+    elif ndarray_type is not None and isinstance(v, ndarray_type):
+        return v.tolist()
+
+    elif is_iterable(v):
+        if _depth >= _RECURSIVE_JSON_DEPTH:
+            return _to_json_value_by_stack(v)
+        _depth += 1
+        return [to_json_value(x, _depth) for x in v]
+
+    else:
+        return v
 
-        # load additionalProperties
-        # TODO: add config class for dealing with additional properties
-        # TODO: add root class setting
-        for k, v in six.iteritems(kwargs):
-            if k in processed_key_set:
-                continue
 
-            setattr(self, k, v)
+def _to_json_value_by_stack(v):
+    root, items = _new_json_container(v)
+    # (JSON container, iterator of (key, value) to fill in)
+    stack = [(root, items)]
+    while stack:
+        container, items = stack[-1]
+        is_dict = type(container) is dict
 
-    def __to_json_value(self, v):
-        if isinstance(v, BaseModel):
-            return v.to_json_dict()
+        for key, value in items:
+            value_type = type(value)
+            if value_type in JSON_PRIMITIVE_TYPE_SET:
+                pass
 
-        elif isinstance(v, Mapping):
-            return {_k: self.__to_json_value(_v) for _k, _v in six.iteritems(v)}
+            elif value_type in JSON_TEXT_CONVERTER_MAP:
+                value = JSON_TEXT_CONVERTER_MAP[value_type](value)
 
-        elif is_iterable(v):
-            return [self.__to_json_value(x) for x in v]
+            elif isinstance(value, BaseModel):
+                value = value.to_json_dict()
 
+            elif ndarray_type is not None and isinstance(value, ndarray_type):
+                value = value.tolist()
+
+            elif isinstance(value, Mapping) or is_iterable(value):
+                child, child_items = _new_json_container(value)
+                if is_dict:
+                    container[key] = child
+                else:
+                    container.append(child)
+                # continue with the child, then back to rest of items
+                stack.append((child, child_items))
+                break
+
+            if is_dict:
+                container[key] = value
+            else:
+                container.append(value)
+
+        else:
+            stack.pop()
+
+    return root
+
+
+def _new_json_container(v):
+    if isinstance(v, Mapping):
+        return {}, six.iteritems(v)
+
+    return [], six.moves.zip(repeat(None), v)
+
+
+EXTRA_PROPERTY_POLICY_SET = {'keep', 'ignore', 'forbid'}
+
+_DEFAULT_MODEL_CONFIG = {
+    # store declared fields in __slots__ instead of instance __dict__,
+    # instances still have __dict__ if any base model is not compact
+    'compact': False,
+    # how to deal with additional properties: keep / ignore / forbid
+    'extra': 'keep',
+    # defer validating nested objects, arrays and regex until first access
+    'lazy': False,
+}
+
+
+class _LazyField(object):
+    '''
+    Descriptor of deferred fields in lazy models, validates the raw value on
+    first access and caches result into instance __dict__. Assigning or
+    deleting the attribute drops the raw value.
+    '''
+
+    def __init__(self, name, field):
+        self.name = name
+        self.field = field
+
+    def __get__(self, obj, cls=None):
+        if obj is None:
+            return self.field
+
+        obj_dict = obj.__dict__
+        try:
+            return obj_dict[self.name]
+        except KeyError:
+            pass
+
+        lazy_state = obj_dict.get(LAZY_STATE_NAME)
+        if lazy_state is None or self.name not in lazy_state.raw_map:
+            raise AttributeError(self.name)
+
+        try:
+            value = self.field.parse(
+                lazy_state.raw_map[self.name], lazy_state.position + [self.name]
+            )
+        except DeferredSchemaValidationError:
+            raise
+        except SchemaValidationError as e:
+            raise DeferredSchemaValidationError(e)
+
+        obj_dict[self.name] = value
+        self._drop_raw_value(obj_dict)
+        return value
+
+    def __set__(self, obj, value):
+        obj_dict = obj.__dict__
+        obj_dict[self.name] = value
+        self._drop_raw_value(obj_dict)
+
+    def __delete__(self, obj):
+        obj_dict = obj.__dict__
+        is_resolved = obj_dict.pop(self.name, _NOT_SET) is not _NOT_SET
+        if not self._drop_raw_value(obj_dict) and not is_resolved:
+            raise AttributeError(self.name)
+
+    def _drop_raw_value(self, obj_dict):
+        lazy_state = obj_dict.get(LAZY_STATE_NAME)
+        if lazy_state is None or self.name not in lazy_state.raw_map:
+            return False
+
+        # replace instead of mutating the state, which may be shared by copies
+        raw_map = dict(lazy_state.raw_map)
+        del raw_map[self.name]
+        if raw_map:
+            obj_dict[LAZY_STATE_NAME] = LazyState(raw_map, lazy_state.position)
+        else:
+            del obj_dict[LAZY_STATE_NAME]
+
+        return True
+
+
+class BaseModelMeta(type):
+    '''
+    Collects schema fields once per class into an immutable, name ordered
+    tuple of (name, field), instead of scanning dir() on every call.
+
+    Also resolves the optional inner `Config` class of models, e.g.
+
+        class UserModel(BaseModel):
+            class Config:
+                compact = True  # store fields in __slots__
+                extra = 'ignore'  # keep / ignore / forbid additional properties
+                lazy = True  # defer validating nested objects, arrays and regex
+
+            name = StringField()
+
+    Config values are inherited by sub classes.
+    '''
+
+    def __new__(mcs, name, bases, attrs):
+        config = dict(_DEFAULT_MODEL_CONFIG)
+        for base in reversed(bases):
+            config.update(getattr(base, '_config', {}))
+
+        config_cls = attrs.get('Config')
+        if config_cls is not None:
+            for k in _DEFAULT_MODEL_CONFIG:
+                if hasattr(config_cls, k):
+                    config[k] = getattr(config_cls, k)
+
+        assert (
+            config['extra'] in EXTRA_PROPERTY_POLICY_SET
+        ), 'unknown extra policy {}'.format(config['extra'])
+        assert not (
+            config['compact'] and config['lazy']
+        ), 'compact models could not be lazy'
+        attrs['_config'] = config
+
+        slotted_name_set = set()
+        for base in bases:
+            slotted_name_set.update(getattr(base, '_slotted_names', ()))
+
+        if config['compact']:
+            # fields are moved out of class attributes for not conflicting with slots
+            slot_field_map = {
+                k: attrs.pop(k)
+                for k, v in list(attrs.items())
+                if isinstance(v, BaseSchemaElement)
+            }
+            attrs['_slot_fields'] = slot_field_map
+
+            field_name_set = set(slot_field_map)
+            for base in bases:
+                field_name_set.update(getattr(base, '_schema_field_map', ()))
+
+            slots = sorted(field_name_set - slotted_name_set)
+            if not any(hasattr(base, '_extras') for base in bases):
+                # side dict for keeping additional properties
+                slots.append('_extras')
+            attrs['__slots__'] = tuple(slots) + tuple(attrs.get('__slots__', ()))
+            slotted_name_set.update(field_name_set)
+
+        attrs['_slotted_names'] = tuple(sorted(slotted_name_set))
+
+        return super(BaseModelMeta, mcs).__new__(mcs, name, bases, attrs)
+
+    def __init__(cls, name, bases, attrs):
+        super(BaseModelMeta, cls).__init__(name, bases, attrs)
+        cls._refresh_schema_fields()
+
+    def _refresh_schema_fields(cls):
+        field_map = {}
+        for klass in reversed(cls.__mro__):
+            klass_attrs = vars(klass)
+            klass_slots = klass_attrs.get('__slots__', ())
+            for name, value in six.iteritems(klass_attrs):
+                if name.startswith('__'):
+                    continue
+
+                if isinstance(value, BaseSchemaElement):
+                    field_map[name] = value
+                elif isinstance(value, _LazyField):
+                    field_map[name] = value.field
+                elif name not in klass_slots:
+                    # overridden by non-field attribute
+                    field_map.pop(name, None)
+
+            field_map.update(klass_attrs.get('_slot_fields', {}))
+
+        if cls._config['lazy']:
+            for name, field in six.iteritems(field_map):
+                attr = vars(cls).get(name)
+                if get_deferred_type_check(field) is not None and not (
+                    isinstance(attr, _LazyField) and attr.field is field
+                ):
+                    type.__setattr__(cls, name, _LazyField(name, field))
+
+        type.__setattr__(cls, '_schema_fields', tuple(sorted(field_map.items())))
+        type.__setattr__(cls, '_schema_field_map', field_map)
+        # validator/serializer are compiled on first use
+        type.__setattr__(cls, '_validator', None)
+        type.__setattr__(cls, '_serializer', None)
+
+        for sub_cls in cls.__subclasses__():
+            sub_cls._refresh_schema_fields()
+
+    def __setattr__(cls, name, value):
+        super(BaseModelMeta, cls).__setattr__(name, value)
+        if isinstance(value, BaseSchemaElement) or name in cls._schema_field_map:
+            cls._refresh_schema_fields()
+
+    def __delattr__(cls, name):
+        super(BaseModelMeta, cls).__delattr__(name)
+        if name in cls._schema_field_map:
+            cls._refresh_schema_fields()
+
+
+class BaseModel(six.with_metaclass(BaseModelMeta, object)):
+    # no instance __dict__ here, so compact models could really go without it,
+    # regular subclasses still get __dict__ by not declaring __slots__
+    __slots__ = ()
+
+    def __init__(self, *args, **kwargs):
+        cls = type(self)
+        validator = cls._validator
+        if validator is None:
+            validator = cls._compile_validator()
+
+        # TODO: add root class setting
+        validator(self, kwargs)
+
+    def bind_lazy_position(self, position):
+        '''
+        Record position of lazy model, so errors of its deferred fields are
+        reported at the same position as validating eagerly.
+        '''
+        lazy_state = self.__dict__.get(LAZY_STATE_NAME)
+        if lazy_state is not None:
+            self.__dict__[LAZY_STATE_NAME] = LazyState(
+                lazy_state.raw_map, list(position)
+            )
+
+    def resolve_lazy_fields(self):
+        '''
+        Validate all deferred fields of lazy model.
+        '''
+        lazy_state = self.__dict__.get(LAZY_STATE_NAME)
+        if lazy_state is not None:
+            for name in sorted(lazy_state.raw_map):
+                getattr(self, name)
+
+    def _iter_value_items(self):
+        if self._config['lazy']:
+            self.resolve_lazy_fields()
+
+        for name in self._slotted_names:
+            value = getattr(self, name, _NOT_SET)
+            if value is not _NOT_SET:
+                yield name, value
+
+        if self._config['compact']:
+            extras = getattr(self, '_extras', None)
+            if extras:
+                for item in six.iteritems(extras):
+                    yield item
         else:
-            return v
+            for item in six.iteritems(self.__dict__):
+                yield item
 
     def to_json_dict(self):
-        json_d = {}
-        for k, v in self.__dict__.items():
-            json_d[k] = self.__to_json_value(v)
+        cls = type(self)
+        serializer = cls._serializer
+        if serializer is None:
+            serializer = cls._compile_serializer()
 
-        return json_d
+        return serializer(self)
 
     @classmethod
-    def get_schema_field(cls, name):
-        field = getattr(cls, name, None)
-        if isinstance(field, BaseSchemaElement):
-            return field
+    def construct(cls, **values):
+        '''
+        Create instance from trusted (already validated) values, skipping
+        validation. Default values are still applied for missing fields.
+        '''
+        obj = cls.__new__(cls)
+        slotted_name_set = cls._slotted_names
+        obj_dict = None if cls._config['compact'] else obj.__dict__
+
+        for name, field in cls._schema_fields:
+            value = values.get(name)
+            if value is None and field.default_value is not NO_DEFULAT_VALUE:
+                value = field.default_value
+
+            if name in slotted_name_set:
+                setattr(obj, name, value)
+            else:
+                obj_dict[name] = value
+
+        if cls._config['extra'] == 'keep':
+            extras = {
+                k: v for k, v in six.iteritems(values) if k not in cls._schema_field_map
+            }
+            if obj_dict is not None:
+                obj_dict.update(extras)
+            elif extras:
+                obj._extras = extras
 
-        return None
+        return obj
+
+    def copy(self, update=None):
+        '''
+        Return shallow copy of instance, only values in update are validated.
+        '''
+        cls = type(self)
+        values = dict(self._iter_value_items())
+
+        for k, v in six.iteritems(update or {}):
+            field = cls._schema_field_map.get(k)
+            if field is not None:
+                v = field.parse(v, [k])
+            elif cls._config['extra'] == 'forbid':
+                raise SchemaValidationError(
+                    v, 'ADDITIONAL_PROPERTY_NOT_ALLOWED', position=[k]
+                )
+
+            values[k] = v
+
+        return cls.construct(**values)
 
     @classmethod
-    def iter_schema_fields(cls):
-        for name in dir(cls):
-            if name.startswith('__'):
+    def parse_many(cls, values, collect_errors=0):
+        '''
+        Parse iterable of values into list of models.
+
+        Dict values are loaded by the compiled validator directly, without
+        going through parse() / __init__ and position lists per item.
+
+        SchemaValidationError of the first invalid item is raised, with item
+        index prepended to its position. If collect_errors > 0, returns
+        (items, errors) instead, invalid items are left as None in items, and
+        parsing stops after collect_errors errors were collected.
+        '''
+        validator = cls._validator
+        if validator is None:
+            validator = cls._compile_validator()
+
+        # subclasses customizing __init__ / parse must go through them
+        fast = (
+            six.get_unbound_function(cls.__init__) is _base_model_init
+            and cls.parse.__func__ is _base_model_parse
+        )
+        new = cls.__new__
+        parse = cls.parse
+
+        items = []
+        errors = []
+        for idx, value in enumerate(values):
+            try:
+                if fast and type(value) is dict:
+                    item = new(cls)
+                    validator(item, value)
+                else:
+                    item = parse(value)
+            except SchemaValidationError as e:
+                e.position = [idx] + e.position
+                if not collect_errors:
+                    raise e
+
+                items.append(None)
+                errors.append(e)
+                if len(errors) >= collect_errors:
+                    break
                 continue
 
-            value = getattr(cls, name)
-            if isinstance(value, BaseSchemaElement):
-                yield (name, value)
+            items.append(item)
+
+        if collect_errors:
+            return items, errors
+
+        return items
+
+    @classmethod
+    def _compile_validator(cls):
+        validator = compile_validator(cls)
+        type.__setattr__(cls, '_validator', validator)
+        return validator
+
+    @classmethod
+    def _compile_serializer(cls):
+        serializer = compile_serializer(cls)
+        type.__setattr__(cls, '_serializer', serializer)
+        return serializer
+
+    @classmethod
+    def get_schema_field(cls, name):
+        return cls._schema_field_map.get(name)
+
+    @classmethod
+    def iter_schema_fields(cls):
+        return iter(cls._schema_fields)
 
     @classmethod
     def get_json_schema(cls):
-        if cls in _model_to_ref_name_map:
-            return _ref_name_to_schema_map[_model_to_ref_name_map[cls]]
+        ref_name = _model_to_ref_name_map.get(cls)
+        if ref_name is not None:
+            return _ref_name_to_schema_map[ref_name]
+
+        # ref names are global, decide them one at a time
+        with _ref_name_lock:
+            if cls in _model_to_ref_name_map:
+                return _ref_name_to_schema_map[_model_to_ref_name_map[cls]]
 
-        schema_d = {}
-        schema_d['type'] = 'object'
-        schema_d['properties'] = OrderedDict()
-        schema_d['required'] = []
+            schema_d = {}
+            schema_d['type'] = 'object'
+            schema_d['properties'] = OrderedDict()
+            schema_d['required'] = []
 
-        for name, field in cls.iter_schema_fields():
-            schema_d['properties'][name] = field.get_json_schema()
-            if field.required:
-                schema_d['required'].append(name)
+            for name, field in cls.iter_schema_fields():
+                schema_d['properties'][name] = field.get_json_schema()
+                if field.required:
+                    schema_d['required'].append(name)
 
-        ref_name = cls.__name__
-        if ref_name in _ref_name_to_schema_map:
-            ref_name = cls.__module__.replace('.', '_') + '_' + ref_name
+            if cls._config['extra'] == 'forbid':
+                schema_d['additionalProperties'] = False
 
-        _ref_name_to_schema_map[ref_name] = schema_d
-        _model_to_ref_name_map[cls] = ref_name
+            ref_name = cls.__name__
+            if ref_name in _ref_name_to_schema_map:
+                ref_name = cls.__module__.replace('.', '_') + '_' + ref_name
+
+            _ref_name_to_schema_map[ref_name] = schema_d
+            _model_to_ref_name_map[cls] = ref_name
 
         return schema_d
 
     @classmethod
     def get_json_schema_ref(cls):
-        if cls in _model_to_ref_name_map:
-            return _model_to_ref_name_map[cls]
+        ref_name = _model_to_ref_name_map.get(cls)
+        if ref_name is not None:
+            return ref_name
 
         cls.get_json_schema()
         return _model_to_ref_name_map[cls]
 
+    @classmethod
+    def get_referenced_models(cls):
+        '''
+        Return models directly referenced by schema fields of cls.
+        '''
+        models = []
+        for _, field in cls.iter_schema_fields():
+            for model_cls in field.get_referenced_models():
+                if model_cls not in models:
+                    models.append(model_cls)
+        return models
+
     @classmethod
     def get_ref_name_to_schema_map(cls):
         return copy(_ref_name_to_schema_map)
@@ -120,9 +584,16 @@ class BaseModel(object):
         elif isinstance(value, Mapping):
             value_dict = value
 
+        elif isinstance(value, BaseModel):
+            value_dict = dict(value._iter_value_items())
+
         else:
             value_dict = {
                 k: getattr(value, k) for k in dir(value) if not k.startswith('_')
             }
 
         return cls(**value_dict)
+
+
+_base_model_init = six.get_unbound_function(BaseModel.__init__)
+_base_model_parse = BaseModel.parse.__func__
@@ -0,0 +1,416 @@
+# -*- coding:utf-8 -*-
+from __future__ import unicode_literals
+from __future__ import print_function
+
+import six
+
+from .fields import (
+    StringField,
+    NumberField,
+    IntegerField,
+    BooleanField,
+    ObjectField,
+    ArrayField,
+    UnionField,
+)
+from .fields.constants import NO_DEFULAT_VALUE
+from .fields.exceptions import SchemaValidationError
+
+
+class _SourceBuilder(object):
+    def __init__(self):
+        self.lines = []
+        self.namespace = {}
+
+    def add_line(self, indent, line):
+        self.lines.append('    ' * indent + line)
+
+    def add_const(self, prefix, value):
+        name = '{}_{}'.format(prefix, len(self.namespace))
+        self.namespace[name] = value
+        return name
+
+    def build(self, fn_name, display_name):
+        source = '\n'.join(self.lines) + '\n'
+        six.exec_(compile(source, '<{}>'.format(display_name), 'exec'), self.namespace)
+        fn = self.namespace[fn_name]
+        fn.__source__ = source
+        return fn
+
+
+def _add_string_checks(builder, indent, field):
+    builder.add_line(indent, 'if type(value) is not text_type:')
+    builder.add_line(indent + 1, 'try:')
+    builder.add_line(indent + 2, 'value = ensure_text(value)')
+    builder.add_line(indent + 1, 'except Exception:')
+    builder.add_line(indent + 2, 'invalid = True')
+
+    conds = []
+    if field.min_length is not None or field.max_length is not None:
+        builder.add_line(indent, 'if not invalid:')
+        builder.add_line(indent + 1, 'length = len(value)')
+        if field.min_length is not None:
+            conds.append(
+                'length < {}'.format(builder.add_const('min_length', field.min_length))
+            )
+        if field.max_length is not None:
+            conds.append(
+                'length > {}'.format(builder.add_const('max_length', field.max_length))
+            )
+    if field.enums:
+        conds.append(
+            'value not in {}'.format(builder.add_const('enum_set', field.enum_set))
+        )
+    if field.regex:
+        conds.append(
+            'not {}(value)'.format(builder.add_const('regex_match', field.regex.match))
+        )
+
+    if conds:
+        builder.add_line(indent, 'if not invalid and ({}):'.format(' or '.join(conds)))
+        builder.add_line(indent + 1, 'invalid = True')
+
+
+def _add_number_checks(builder, indent, field):
+    # non number values are converted by field.parse()
+    builder.add_line(indent, 'if not isinstance(value, (int, float)):')
+    builder.add_line(indent + 1, 'invalid = True')
+    _add_number_constraint_checks(builder, indent, field, [])
+
+
+def _add_integer_checks(builder, indent, field):
+    # bools, floats and text are converted or rejected by field.parse()
+    builder.add_line(
+        indent,
+        'if type(value) not in {}:'.format(
+            builder.add_const('integer_types', six.integer_types)
+        ),
+    )
+    builder.add_line(indent + 1, 'invalid = True')
+
+    conds = []
+    if field.int_range is not None:
+        conds.append(
+            'not {} <= value <= {}'.format(
+                builder.add_const('int_min', field.int_range[0]),
+                builder.add_const('int_max', field.int_range[1]),
+            )
+        )
+    _add_number_constraint_checks(builder, indent, field, conds)
+
+
+def _add_number_constraint_checks(builder, indent, field, conds):
+    if field.enums:
+        conds.append(
+            'value not in {}'.format(builder.add_const('enum_set', field.enum_set))
+        )
+    for attr, op in (('gt', '>'), ('gte', '>='), ('lt', '<'), ('lte', '<=')):
+        constraint = getattr(field, attr)
+        if constraint is not None:
+            conds.append(
+                'not value {} {}'.format(op, builder.add_const(attr, constraint))
+            )
+    if field.multiple_of is not None:
+        conds.append(
+            'value % {} != 0'.format(
+                builder.add_const('multiple_of', field.multiple_of)
+            )
+        )
+
+    if conds:
+        builder.add_line(indent, 'elif {}:'.format(' or '.join(conds)))
+        builder.add_line(indent + 1, 'invalid = True')
+
+
+def _add_boolean_checks(builder, indent, field):
+    builder.add_line(indent, 'if value is not True and value is not False:')
+    builder.add_line(indent + 1, 'invalid = True')
+
+
+_FIELD_TYPE_TO_CHECKS_FN_MAP = {
+    StringField: _add_string_checks,
+    NumberField: _add_number_checks,
+    IntegerField: _add_integer_checks,
+    BooleanField: _add_boolean_checks,
+}
+
+
+# instance __dict__ key of raw values deferred by lazy models
+LAZY_STATE_NAME = '__lazy_state__'
+
+
+class LazyState(object):
+    '''
+    Raw values of deferred fields. States could be shared by shallow copies
+    of models, so they are replaced rather than mutated once the model is
+    constructed.
+    '''
+
+    __slots__ = ('raw_map', 'position')
+
+    def __init__(self, raw_map=None, position=None):
+        # field name -> raw value, not validated yet
+        self.raw_map = {} if raw_map is None else raw_map
+        # position of the model, for reporting errors found later
+        self.position = [] if position is None else position
+
+
+def get_deferred_type_check(field):
+    '''
+    Return expression checking value type for deferring validation of field
+    in lazy models, or None if field is always validated eagerly.
+    '''
+    if isinstance(field, ArrayField):
+        return 'type(value) is list'
+
+    if isinstance(field, (ObjectField, UnionField)):
+        return 'type(value) is dict'
+
+    if type(field) is StringField and field.regex:
+        return 'type(value) is text_type'
+
+    return None
+
+
+def _add_deferred_field_lines(builder, field_var, name_var, type_check):
+    builder.add_line(1, 'if value is None:')
+    # raises FIELD_IS_REQUIRED
+    builder.add_line(
+        2, 'obj_dict[{1}] = {0}.parse(value, [{1}])'.format(field_var, name_var)
+    )
+    builder.add_line(1, 'elif {}:'.format(type_check))
+    builder.add_line(2, 'if lazy_state is None:')
+    builder.add_line(3, 'lazy_state = obj_dict[LAZY_STATE_NAME] = LazyState()')
+    builder.add_line(2, 'lazy_state.raw_map[{}] = value'.format(name_var))
+    # type mismatched values are parsed right now, for reporting errors eagerly
+    builder.add_line(1, 'else:')
+    builder.add_line(
+        2, 'obj_dict[{1}] = {0}.parse(value, [{1}])'.format(field_var, name_var)
+    )
+
+
+def compile_validator(model_cls):
+    '''
+    Generate validator function specialized to fields of model_cls.
+
+    validator(obj, kwargs) validates kwargs and loads them into obj.__dict__,
+    same as the generic field.parse() loop, but constraint checks of basic
+    fields are inlined. The field.parse() with position list is only called
+    for fields need value conversion or raising SchemaValidationError, so error
+    types/positions are always the same as field.parse() reports.
+    '''
+    slotted_name_set = set(model_cls._slotted_names)
+    compact = model_cls._config['compact']
+    extra = model_cls._config['extra']
+    lazy = model_cls._config['lazy']
+
+    builder = _SourceBuilder()
+    builder.namespace.update(
+        text_type=six.text_type,
+        ensure_text=six.ensure_text,
+        field_name_set=frozenset(name for name, _ in model_cls.iter_schema_fields()),
+        SchemaValidationError=SchemaValidationError,
+        LAZY_STATE_NAME=LAZY_STATE_NAME,
+        LazyState=LazyState,
+    )
+
+    builder.add_line(0, 'def validate(obj, kwargs):')
+    builder.add_line(1, 'get = kwargs.get')
+    # never touch __dict__ of compact models, for not allocating it
+    if (extra == 'keep' and not compact) or any(
+        name not in slotted_name_set for name, _ in model_cls.iter_schema_fields()
+    ):
+        builder.add_line(1, 'obj_dict = obj.__dict__')
+    if lazy:
+        builder.add_line(1, 'lazy_state = None')
+
+    for name, field in model_cls.iter_schema_fields():
+        field_var = builder.add_const('field', field)
+        name_var = builder.add_const('name', name)
+        if name in slotted_name_set:
+            assign_line = 'obj.{} = value'.format(name)
+        else:
+            assign_line = 'obj_dict[{}] = value'.format(name_var)
+
+        builder.add_line(1, 'value = get({})'.format(name_var))
+
+        type_check = get_deferred_type_check(field) if lazy else None
+        if type_check is not None:
+            if field.default_value is not NO_DEFULAT_VALUE:
+                builder.add_line(1, 'if value is None:')
+                builder.add_line(
+                    2,
+                    'value = {}'.format(
+                        builder.add_const('default', field.default_value)
+                    ),
+                )
+            _add_deferred_field_lines(builder, field_var, name_var, type_check)
+            continue
+
+        checks_fn = _FIELD_TYPE_TO_CHECKS_FN_MAP.get(type(field))
+        if checks_fn is None:
+            builder.add_line(
+                1, 'value = {}.parse(value, [{}])'.format(field_var, name_var)
+            )
+            builder.add_line(1, assign_line)
+            continue
+
+        if field.default_value is not NO_DEFULAT_VALUE:
+            builder.add_line(1, 'if value is None:')
+            builder.add_line(
+                2,
+                'value = {}'.format(builder.add_const('default', field.default_value)),
+            )
+
+        builder.add_line(1, 'if value is None:')
+        if field.required:
+            # raises FIELD_IS_REQUIRED
+            builder.add_line(
+                2, 'value = {}.parse(value, [{}])'.format(field_var, name_var)
+            )
+        else:
+            builder.add_line(2, 'pass')
+        builder.add_line(1, 'else:')
+        builder.add_line(2, 'invalid = False')
+        checks_fn(builder, 2, field)
+        builder.add_line(2, 'if invalid:')
+        builder.add_line(3, 'value = {}.parse(value, [{}])'.format(field_var, name_var))
+        builder.add_line(1, assign_line)
+
+    # load additionalProperties
+    if extra == 'forbid':
+        builder.add_line(1, 'for key in kwargs:')
+        builder.add_line(2, 'if key not in field_name_set:')
+        builder.add_line(
+            3,
+            'raise SchemaValidationError(kwargs[key], '
+            '\'ADDITIONAL_PROPERTY_NOT_ALLOWED\', position=[key])',
+        )
+    elif extra == 'keep' and compact:
+        builder.add_line(1, 'extras = None')
+        builder.add_line(1, 'for key in kwargs:')
+        builder.add_line(2, 'if key not in field_name_set:')
+        builder.add_line(3, 'if extras is None:')
+        builder.add_line(4, 'extras = obj._extras = {}')
+        builder.add_line(3, 'extras[key] = kwargs[key]')
+    elif extra == 'keep':
+        builder.add_line(1, 'for key in kwargs:')
+        builder.add_line(2, 'if key not in field_name_set:')
+        if lazy:
+            builder.add_line(3, 'if key == LAZY_STATE_NAME:')
+            builder.add_line(
+                4,
+                'raise SchemaValidationError(kwargs[key], '
+                '\'ADDITIONAL_PROPERTY_NOT_ALLOWED\', position=[key])',
+            )
+        builder.add_line(3, 'obj_dict[key] = kwargs[key]')
+
+    return builder.build('validate', 'validate ' + model_cls.__name__)
+
+
+def _add_json_value_line(builder, indent, field, key_var):
+    if type(field) in _FIELD_TYPE_TO_CHECKS_FN_MAP:
+        builder.add_line(
+            indent,
+            'json_d[{}] = value if type(value) in primitive_type_set '
+            'else to_json_value(value)'.format(key_var),
+        )
+
+    elif isinstance(field, ObjectField):
+        builder.add_line(
+            indent,
+            'json_d[{}] = value.to_json_dict() if isinstance(value, BaseModel) '
+            'else to_json_value(value)'.format(key_var),
+        )
+
+    elif isinstance(field, ArrayField) and isinstance(field.item_field, ObjectField):
+        builder.add_line(indent, 'if type(value) is list:')
+        builder.add_line(
+            indent + 1,
+            'json_d[{}] = [x.to_json_dict() if isinstance(x, BaseModel) '
+            'else to_json_value(x) for x in value]'.format(key_var),
+        )
+        builder.add_line(indent, 'else:')
+        builder.add_line(
+            indent + 1, 'json_d[{}] = to_json_value(value)'.format(key_var)
+        )
+
+    elif isinstance(field, ArrayField) and (
+        type(field.item_field) in _FIELD_TYPE_TO_CHECKS_FN_MAP
+    ):
+        builder.add_line(indent, 'if type(value) is list:')
+        builder.add_line(
+            indent + 1,
+            'json_d[{}] = [x if type(x) in primitive_type_set '
+            'else to_json_value(x) for x in value]'.format(key_var),
+        )
+        builder.add_line(indent, 'else:')
+        builder.add_line(
+            indent + 1, 'json_d[{}] = to_json_value(value)'.format(key_var)
+        )
+
+    else:
+        builder.add_line(indent, 'json_d[{}] = to_json_value(value)'.format(key_var))
+
+
+def compile_serializer(model_cls):
+    '''
+    Generate serializer function specialized to fields of model_cls.
+
+    serializer(obj) returns the same JSON dict as converting every value of
+    obj via to_json_value(), but it knows statically which fields hold
+    primitives, nested models or arrays of models, so ABC isinstance checks
+    are only paid for additional properties and unexpected values.
+    '''
+    from .base import BaseModel, to_json_value, JSON_PRIMITIVE_TYPE_SET
+
+    slotted_name_set = set(model_cls._slotted_names)
+    compact = model_cls._config['compact']
+    fields = list(model_cls.iter_schema_fields())
+
+    builder = _SourceBuilder()
+    builder.namespace.update(
+        BaseModel=BaseModel,
+        to_json_value=to_json_value,
+        primitive_type_set=JSON_PRIMITIVE_TYPE_SET,
+        field_name_set=frozenset(name for name, _ in fields),
+        NOT_SET=object(),
+        LAZY_STATE_NAME=LAZY_STATE_NAME,
+    )
+
+    builder.add_line(0, 'def serialize(obj):')
+    builder.add_line(1, 'json_d = {}')
+    if not compact:
+        builder.add_line(1, 'obj_dict = obj.__dict__')
+        builder.add_line(1, 'found = 0')
+    if model_cls._config['lazy']:
+        builder.add_line(1, 'if LAZY_STATE_NAME in obj_dict:')
+        builder.add_line(2, 'obj.resolve_lazy_fields()')
+
+    for name, field in fields:
+        name_var = builder.add_const('name', name)
+        if name in slotted_name_set:
+            builder.add_line(1, 'value = getattr(obj, {}, NOT_SET)'.format(name_var))
+        else:
+            builder.add_line(1, 'value = obj_dict.get({}, NOT_SET)'.format(name_var))
+
+        builder.add_line(1, 'if value is not NOT_SET:')
+        if name not in slotted_name_set:
+            builder.add_line(2, 'found += 1')
+        _add_json_value_line(builder, 2, field, name_var)
+
+    # dump additionalProperties
+    if compact:
+        builder.add_line(1, 'extras = getattr(obj, \'_extras\', None)')
+        builder.add_line(1, 'if extras:')
+        builder.add_line(2, 'for key, value in extras.items():')
+        builder.add_line(3, 'json_d[key] = to_json_value(value)')
+    else:
+        builder.add_line(1, 'if len(obj_dict) > found:')
+        builder.add_line(2, 'for key, value in obj_dict.items():')
+        builder.add_line(3, 'if key not in field_name_set:')
+        builder.add_line(4, 'json_d[key] = to_json_value(value)')
+
+    builder.add_line(1, 'return json_d')
+
+    return builder.build('serialize', 'serialize ' + model_cls.__name__)
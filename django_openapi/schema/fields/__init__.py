@@ -1,6 +1,9 @@
 from .base import BaseSchemaElement
 from .number import NumberField
+from .integer import IntegerField
 from .string import StringField
 from .object import ObjectField
 from .boolean import BooleanField
 from .array import ArrayField
+from .union import UnionField
+from .formats import DateTimeField, DateField, UUIDField, DecimalField
@@ -8,8 +8,16 @@ import six
 
 from .base import BaseSchemaElement
 from .constants import NO_DEFULAT_VALUE
-from .exceptions import SchemaValidationError
-from .utils import int_or_none
+from .exceptions import SchemaValidationError, raise_validation_errors
+from .object import ObjectField
+from .utils import int_or_none, parse_items, unique_item_key
+from .vectorize import (
+    VECTORIZE_MIN_ITEMS,
+    ndarray_type,
+    numpy,
+    is_vectorizable,
+    parse_number_array,
+)
 
 
 class ArrayField(BaseSchemaElement):
@@ -24,6 +32,8 @@ class ArrayField(BaseSchemaElement):
         min_items=None,
         max_items=None,
         check_unique_items=False,
+        max_errors=1,
+        as_ndarray=False,
     ):
         super(ArrayField, self).__init__(
             default_value=default_value,
@@ -39,6 +49,12 @@ class ArrayField(BaseSchemaElement):
         self.min_items = int_or_none(min_items)
         self.max_items = int_or_none(max_items)
         self.check_unique_items = check_unique_items
+        # report up to max_errors invalid items at once
+        self.max_errors = max(int(max_errors), 1)
+        # hand over parsed number array as numpy.ndarray
+        assert not as_ndarray or ndarray_type is not None, 'as_ndarray needs numpy'
+        self.as_ndarray = as_ndarray
+        self.vectorizable = is_vectorizable(item_field)
 
     def parse(self, value, position):
         value = super(ArrayField, self).parse(value, position)
@@ -51,23 +67,33 @@ class ArrayField(BaseSchemaElement):
                 value, 'TYPE_MISMATCH', constraint='array', position=position,
             )
 
-        if self.check_unique_items:
-            value_set = set()
-            for idx, item in enumerate(value):
-                if item in value_set:
-                    raise SchemaValidationError(
-                        item,
-                        'ARRAY_HAS_NON_UNIQUE_ITEM',
-                        constraint=None,
-                        position=position + [idx],
-                    )
-                value_set.add(item)
-
-        new_values = []
-        for idx, item in enumerate(value):
-            new_values.append(self.item_field.parse(item, position + [idx]))
+        if not isinstance(value, list):
+            value = list(value)
+
+        if isinstance(self.item_field, ObjectField):
+            value = self.item_field.parse_many(value, position, self.max_errors)
+
+        elif self.vectorizable and (
+            self.as_ndarray or len(value) >= VECTORIZE_MIN_ITEMS
+        ):
+            arr, errors = parse_number_array(
+                self.item_field, value, position, self.max_errors
+            )
+            if errors:
+                raise_validation_errors(errors, position)
+            if arr is None:
+                value = parse_items(self.item_field, value, position, self.max_errors)
+            elif self.as_ndarray:
+                value = arr
+
+        else:
+            value = parse_items(self.item_field, value, position, self.max_errors)
 
-        value = new_values
+        if self.as_ndarray and not isinstance(value, ndarray_type):
+            value = numpy.asarray(value)
+
+        if self.check_unique_items:
+            self.check_unique(value, position)
 
         if self.min_items is not None and len(value) < self.min_items:
             raise SchemaValidationError(
@@ -87,6 +113,29 @@ class ArrayField(BaseSchemaElement):
 
         return value
 
+    def check_unique(self, value, position):
+        '''
+        Check parsed items are unique in one pass, items are compared by
+        canonical keys, so arrays of objects / arrays are supported.
+        '''
+        if isinstance(value, ndarray_type):
+            value = value.tolist()
+
+        key_set = set()
+        for idx, item in enumerate(value):
+            key = unique_item_key(item)
+            if key in key_set:
+                raise SchemaValidationError(
+                    item,
+                    'ARRAY_HAS_NON_UNIQUE_ITEM',
+                    constraint=None,
+                    position=position + [idx],
+                )
+            key_set.add(key)
+
+    def get_referenced_models(self):
+        return self.item_field.get_referenced_models()
+
     def get_json_schema(self):
         schema_d = super(ArrayField, self).get_json_schema()
         schema_d['type'] = 'array'
@@ -53,6 +53,12 @@ class BaseSchemaElement(six.with_metaclass(ABCMeta, object)):
 
         return schema_d
 
+    def get_referenced_models(self):
+        '''
+        Return models referenced by this field, for collecting components.
+        '''
+        return ()
+
     # @abstractmethod
     # def get_value(self):
     #     pass
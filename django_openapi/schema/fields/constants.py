@@ -18,6 +18,9 @@ SCHEMA_ERROR_TYPE_SET = {
     'TEXT_TOO_SHORT',
     'REGEX_NOT_MATCH',
     'FIELD_IS_REQUIRED',
+    'ADDITIONAL_PROPERTY_NOT_ALLOWED',
+    'PAYLOAD_TOO_DEEP',
+    'PAYLOAD_TOO_LARGE',
 }
 
 NO_DEFULAT_VALUE = object()
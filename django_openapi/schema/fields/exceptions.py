@@ -24,3 +24,68 @@ class SchemaValidationError(Exception):
 
     def __str__(self):
         return self.__repr__()
+
+    def flatten(self):
+        return [self]
+
+
+class MultipleSchemaValidationError(SchemaValidationError):
+    '''
+    Group of errors found in one array field, value / err_type / constraint
+    are taken from the first error. Positions of grouped errors are relative
+    to position of the group, use flatten() for errors with full positions.
+    '''
+
+    def __init__(self, errors, position=None):
+        first_error = errors[0]
+        super(MultipleSchemaValidationError, self).__init__(
+            first_error.value,
+            first_error.err_type,
+            constraint=first_error.constraint,
+            position=position,
+        )
+        self.errors = errors
+
+    def flatten(self):
+        return [
+            SchemaValidationError(
+                e.value,
+                e.err_type,
+                constraint=e.constraint,
+                position=self.position + e.position,
+            )
+            for error in self.errors
+            for e in error.flatten()
+        ]
+
+
+class DeferredSchemaValidationError(SchemaValidationError):
+    '''
+    Error of validation deferred by lazy models, raised when the value is
+    first accessed. Positions are the same as validating eagerly.
+    '''
+
+    def __init__(self, error):
+        super(DeferredSchemaValidationError, self).__init__(
+            error.value,
+            error.err_type,
+            constraint=error.constraint,
+            position=error.position,
+        )
+        self.error = error
+
+    def flatten(self):
+        return self.error.flatten()
+
+
+def raise_validation_errors(errors, position):
+    '''
+    Raise single error as is, or group of errors found under position.
+    '''
+    if len(errors) == 1:
+        raise errors[0]
+
+    for e in errors:
+        e.position = e.position[len(position) :]
+
+    raise MultipleSchemaValidationError(errors, position=position)
@@ -0,0 +1,167 @@
+# -*- coding:utf-8 -*-
+from __future__ import unicode_literals
+from __future__ import print_function
+
+from abc import abstractmethod
+from datetime import datetime, date
+from decimal import Decimal, InvalidOperation
+from uuid import UUID
+
+import six
+from django.utils.dateparse import parse_datetime, parse_date
+
+from .base import BaseSchemaElement
+from .constants import NO_DEFULAT_VALUE
+from .exceptions import SchemaValidationError
+
+# stdlib C parsers, only available in python 3.7+
+_datetime_fromisoformat = getattr(datetime, 'fromisoformat', None)
+_date_fromisoformat = getattr(date, 'fromisoformat', None)
+
+# lengths of 'hex' / 'hex-with-hyphens' UUID text
+_UUID_TEXT_LENGTH_SET = {32, 36}
+
+
+class BaseFormatField(BaseSchemaElement):
+    '''
+    String field parsed into python object of specific format.
+    '''
+
+    str_format = None
+
+    def __init__(
+        self,
+        default_value=NO_DEFULAT_VALUE,
+        required=True,
+        title=None,
+        description=None,
+        example=None,
+    ):
+        super(BaseFormatField, self).__init__(
+            default_value=default_value,
+            required=required,
+            title=title,
+            description=description,
+            example=example,
+        )
+
+    def parse(self, value, position):
+        value = super(BaseFormatField, self).parse(value, position)
+
+        if value is None and not self.required:
+            return value
+
+        parsed = self.parse_value(value)
+        if parsed is None:
+            raise SchemaValidationError(
+                value, 'TYPE_MISMATCH', constraint=self.str_format, position=position
+            )
+
+        return parsed
+
+    @abstractmethod
+    def parse_value(self, value):
+        '''
+        Return parsed value, or None if value is invalid.
+        '''
+
+    def get_json_schema(self):
+        schema_d = super(BaseFormatField, self).get_json_schema()
+        schema_d['type'] = 'string'
+        schema_d['format'] = self.str_format
+        return schema_d
+
+
+class DateTimeField(BaseFormatField):
+    str_format = 'date-time'
+
+    def parse_value(self, value):
+        if isinstance(value, datetime):
+            return value
+
+        if not isinstance(value, six.string_types):
+            return None
+
+        if _datetime_fromisoformat is not None:
+            try:
+                return _datetime_fromisoformat(value)
+            except ValueError:
+                pass
+
+        # e.g. trailing 'Z' before python 3.11
+        try:
+            return parse_datetime(value)
+        except ValueError:
+            return None
+
+
+class DateField(BaseFormatField):
+    str_format = 'date'
+
+    def parse_value(self, value):
+        if isinstance(value, datetime):
+            return value.date()
+
+        if isinstance(value, date):
+            return value
+
+        if not isinstance(value, six.string_types):
+            return None
+
+        if _date_fromisoformat is not None:
+            try:
+                return _date_fromisoformat(value)
+            except ValueError:
+                pass
+
+        try:
+            return parse_date(value)
+        except ValueError:
+            return None
+
+
+class UUIDField(BaseFormatField):
+    str_format = 'uuid'
+
+    def parse_value(self, value):
+        if isinstance(value, UUID):
+            return value
+
+        # cheap length check before UUID() normalizing the text
+        if (
+            not isinstance(value, six.string_types)
+            or len(value) not in _UUID_TEXT_LENGTH_SET
+        ):
+            return None
+
+        try:
+            return UUID(value)
+        except ValueError:
+            return None
+
+
+class DecimalField(BaseFormatField):
+    '''
+    Decimal number, serialized as string for keeping precision.
+    '''
+
+    str_format = 'decimal'
+
+    def parse_value(self, value):
+        if isinstance(value, Decimal):
+            decimal_value = value
+        elif isinstance(value, bool):
+            return None
+        elif isinstance(value, six.string_types + six.integer_types + (float,)):
+            # float via text for not picking up binary representation error
+            try:
+                decimal_value = Decimal(six.text_type(value))
+            except InvalidOperation:
+                return None
+        else:
+            return None
+
+        if not decimal_value.is_finite():
+            return None
+
+        return decimal_value
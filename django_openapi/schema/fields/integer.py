@@ -0,0 +1,131 @@
+# -*- coding:utf-8 -*-
+from __future__ import unicode_literals
+from __future__ import print_function
+
+from decimal import Decimal, InvalidOperation
+
+import six
+
+from .constants import NO_DEFULAT_VALUE
+from .exceptions import SchemaValidationError
+from .number import NumberField
+
+# int format -> (min value, max value)
+INT_FORMAT_RANGE_MAP = {
+    'int32': (-(2**31), 2**31 - 1),
+    'int64': (-(2**63), 2**63 - 1),
+}
+
+# integral decimal text with more digits is rejected, same as python 3.11+ int()
+_MAX_INT_TEXT_DIGITS = 4300
+
+
+class IntegerField(NumberField):
+    '''
+    Integer number, text values are converted by int(), or through Decimal
+    for integral decimal text like '5.0', so big integers keep their
+    precision. Bools and non integral numbers are rejected.
+    '''
+
+    def __init__(
+        self,
+        default_value=NO_DEFULAT_VALUE,
+        required=True,
+        title=None,
+        description=None,
+        example=None,
+        gt=None,
+        gte=None,
+        lt=None,
+        lte=None,
+        multiple_of=None,
+        enums=None,
+        int_format=None,
+    ):
+        super(IntegerField, self).__init__(
+            default_value=default_value,
+            required=required,
+            title=title,
+            description=description,
+            example=example,
+            gt=gt,
+            gte=gte,
+            lt=lt,
+            lte=lte,
+            multiple_of=multiple_of,
+            enums=enums,
+        )
+        assert int_format is None or int_format in INT_FORMAT_RANGE_MAP
+        self.int_format = int_format
+        self.int_range = INT_FORMAT_RANGE_MAP.get(int_format)
+
+    def parse(self, value, position):
+        value = super(NumberField, self).parse(value, position)
+
+        if value is None and not self.required:
+            return value
+
+        if type(value) not in six.integer_types:
+            int_value = self.to_int(value)
+            if int_value is None:
+                raise SchemaValidationError(
+                    value, 'TYPE_MISMATCH', constraint='integer', position=position
+                )
+            value = int_value
+
+        if self.int_range is not None:
+            if value < self.int_range[0]:
+                raise SchemaValidationError(
+                    value,
+                    'VALUE_MUST_GREATER_EQUAL_THAN',
+                    constraint=self.int_range[0],
+                    position=position,
+                )
+            if value > self.int_range[1]:
+                raise SchemaValidationError(
+                    value,
+                    'VALUE_MUST_LESSER_EQUAL_THAN',
+                    constraint=self.int_range[1],
+                    position=position,
+                )
+
+        return self.check_constraints(value, position)
+
+    @staticmethod
+    def to_int(value):
+        '''
+        Return int of value, or None if value isn't an integer.
+        '''
+        if isinstance(value, bool):
+            return None
+
+        if isinstance(value, float):
+            return int(value) if value.is_integer() else None
+
+        if isinstance(value, six.string_types + (six.binary_type,)):
+            try:
+                return int(value)
+            except ValueError:
+                pass
+
+            # e.g. '5.0', never through float for keeping precision
+            try:
+                decimal_value = Decimal(six.ensure_text(value))
+            except (InvalidOperation, UnicodeDecodeError):
+                return None
+
+            if (
+                decimal_value.is_finite()
+                and decimal_value.adjusted() < _MAX_INT_TEXT_DIGITS
+                and decimal_value == decimal_value.to_integral_value()
+            ):
+                return int(decimal_value)
+
+        return None
+
+    def get_json_schema(self):
+        schema_d = super(IntegerField, self).get_json_schema()
+        schema_d['type'] = 'integer'
+        if self.int_format:
+            schema_d['format'] = self.int_format
+        return schema_d
@@ -57,6 +57,9 @@ class NumberField(BaseSchemaElement):
                     value, 'TYPE_MISMATCH', constraint='number', position=position,
                 )
 
+        return self.check_constraints(value, position)
+
+    def check_constraints(self, value, position):
         if self.enums and value not in self.enum_set:
             raise SchemaValidationError(
                 value, 'VALUE_NOT_IN_ENUM', constraint=self.enums, position=position,
@@ -8,8 +8,8 @@ from collections import Mapping
 
 from .base import BaseSchemaElement
 from .constants import NO_DEFULAT_VALUE
-from .exceptions import SchemaValidationError
-from .utils import int_or_none
+from .exceptions import SchemaValidationError, raise_validation_errors
+from .utils import int_or_none, parse_items
 
 
 class ObjectField(BaseSchemaElement):
@@ -53,9 +53,48 @@ class ObjectField(BaseSchemaElement):
             e.position = position + e.position
             raise e
 
+        if self.model_cls._config['lazy']:
+            value.bind_lazy_position(position)
+
         return value
 
+    def parse_many(self, values, position, max_errors=1):
+        '''
+        Parse list of item values at once, used by ArrayField.
+        '''
+        if None in values:
+            # default / required handling of absent items
+            return parse_items(self, values, position, max_errors)
+
+        if max_errors <= 1:
+            try:
+                items = self.model_cls.parse_many(values)
+            except SchemaValidationError as e:
+                e.position = position + e.position
+                raise e
+        else:
+            items, errors = self.model_cls.parse_many(values, collect_errors=max_errors)
+            if errors:
+                for e in errors:
+                    e.position = position + e.position
+                raise_validation_errors(errors, position)
+
+        if self.model_cls._config['lazy']:
+            for idx, item in enumerate(items):
+                item.bind_lazy_position(position + [idx])
+
+        return items
+
+    def get_referenced_models(self):
+        return (self.model_cls,)
+
     def get_json_schema(self):
         schema_d = super(ObjectField, self).get_json_schema()
-        schema_d.update(self.model_cls.get_json_schema())
+        ref_d = {'$ref': '#/components/schemas/' + self.model_cls.get_json_schema_ref()}
+
+        if not schema_d:
+            return ref_d
+
+        # siblings of $ref are ignored in OpenAPI 3.0, wrap it for overrides
+        schema_d['allOf'] = [ref_d]
         return schema_d
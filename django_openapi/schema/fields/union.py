@@ -0,0 +1,116 @@
+# -*- coding:utf-8 -*-
+from __future__ import unicode_literals
+from __future__ import print_function
+from __future__ import absolute_import
+
+from collections import Mapping, OrderedDict
+
+import six
+
+from .base import BaseSchemaElement
+from .constants import NO_DEFULAT_VALUE
+from .exceptions import SchemaValidationError
+
+
+class UnionField(BaseSchemaElement):
+    '''
+    Object field of one of several models, the model is picked by value of
+    discriminator property, e.g.
+
+        UnionField('type', {'click': ClickEvent, 'view': ViewEvent})
+
+    Only the picked model validates the value, so parsing cost doesn't grow
+    with the number of models.
+    '''
+
+    def __init__(
+        self,
+        discriminator,
+        mapping,
+        default_value=NO_DEFULAT_VALUE,
+        required=True,
+        title=None,
+        description=None,
+        example=None,
+    ):
+        from ..base import BaseModel
+
+        assert isinstance(discriminator, six.string_types) and discriminator
+        assert mapping, 'mapping must not be empty'
+        for model_cls in six.itervalues(mapping):
+            assert isinstance(model_cls, type) and issubclass(model_cls, BaseModel)
+
+        super(UnionField, self).__init__(
+            default_value=default_value,
+            required=required,
+            title=title,
+            description=description,
+            example=example,
+        )
+        self.discriminator = discriminator
+        self.mapping = OrderedDict(mapping)
+        self.model_classes = tuple(set(self.mapping.values()))
+
+    def parse(self, value, position):
+        value = super(UnionField, self).parse(value, position)
+
+        if value is None and not self.required:
+            return value
+
+        if isinstance(value, self.model_classes):
+            return value
+
+        if not isinstance(value, Mapping):
+            raise SchemaValidationError(
+                value, 'TYPE_MISMATCH', constraint='object', position=position
+            )
+
+        tag = value.get(self.discriminator)
+        if tag is None:
+            raise SchemaValidationError(
+                tag, 'FIELD_IS_REQUIRED', position=position + [self.discriminator]
+            )
+
+        try:
+            model_cls = self.mapping.get(tag)
+        except TypeError:  # unhashable tag
+            model_cls = None
+
+        if model_cls is None:
+            raise SchemaValidationError(
+                tag,
+                'VALUE_NOT_IN_ENUM',
+                constraint=tuple(self.mapping),
+                position=position + [self.discriminator],
+            )
+
+        try:
+            value = model_cls.parse(value)
+        except SchemaValidationError as e:
+            e.position = position + e.position
+            raise e
+
+        if model_cls._config['lazy']:
+            value.bind_lazy_position(position)
+
+        return value
+
+    def get_referenced_models(self):
+        return tuple(OrderedDict.fromkeys(six.itervalues(self.mapping)))
+
+    def get_json_schema(self):
+        schema_d = super(UnionField, self).get_json_schema()
+
+        ref_map = OrderedDict(
+            (tag, '#/components/schemas/' + model_cls.get_json_schema_ref())
+            for tag, model_cls in six.iteritems(self.mapping)
+        )
+
+        schema_d['oneOf'] = [
+            {'$ref': ref} for ref in OrderedDict.fromkeys(ref_map.values())
+        ]
+        schema_d['discriminator'] = {
+            'propertyName': self.discriminator,
+            'mapping': {six.text_type(tag): ref for tag, ref in six.iteritems(ref_map)},
+        }
+        return schema_d
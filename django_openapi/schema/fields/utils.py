@@ -3,10 +3,12 @@ from __future__ import unicode_literals
 from __future__ import print_function
 
 import six
-from collections import Iterable
+from collections import Iterable, Mapping
 
 from six import binary_type
 
+from .exceptions import SchemaValidationError, raise_validation_errors
+
 _ALL_STRING_LIKE_TYPES = tuple(
     [six.text_type, six.binary_type] + list(six.string_types)
 )
@@ -25,7 +27,118 @@ def ensure_set(values):
 
 
 def is_iterable(value):
-    return isinstance(value, Iterable) and not isinstance(
-        value, _ALL_STRING_LIKE_TYPES
-    )
+    return isinstance(value, Iterable) and not isinstance(value, _ALL_STRING_LIKE_TYPES)
+
+
+_HASHABLE_PRIMITIVE_TYPES = frozenset(
+    [type(None), float, six.text_type, six.binary_type]
+    + list(six.integer_types)
+    + list(six.string_types)
+)
+# tags keeping keys of different JSON types apart, e.g. true / 1, {} / []
+_BOOL_TAG = object()
+_OBJECT_TAG = object()
+_ARRAY_TAG = object()
+
+
+def unique_item_key(value):
+    '''
+    Return canonical hashable key of JSON like value for uniqueness check.
+
+    Equal JSON values get equal keys: objects compare regardless of key
+    order, models compare as objects, 1 and 1.0 are equal but true and 1
+    are not.
+    '''
+    value_type = type(value)
+    if value_type in _HASHABLE_PRIMITIVE_TYPES:
+        return value
+
+    if value_type is bool:
+        return (_BOOL_TAG, value)
+
+    if isinstance(value, Mapping):
+        return (
+            _OBJECT_TAG,
+            frozenset((k, unique_item_key(v)) for k, v in six.iteritems(value)),
+        )
+
+    if is_iterable(value):
+        return (_ARRAY_TAG, tuple(unique_item_key(v) for v in value))
+
+    iter_value_items = getattr(value, '_iter_value_items', None)
+    if iter_value_items is not None:  # BaseModel
+        return (
+            _OBJECT_TAG,
+            frozenset((k, unique_item_key(v)) for k, v in iter_value_items()),
+        )
+
+    return value
+
+
+def parse_items(item_field, values, position, max_errors=1):
+    '''
+    Parse values by item_field one by one, stop after max_errors errors.
+    '''
+    new_values = []
+    errors = []
+    for idx, item in enumerate(values):
+        try:
+            new_values.append(item_field.parse(item, position + [idx]))
+        except SchemaValidationError as e:
+            errors.append(e)
+            if len(errors) >= max_errors:
+                break
+
+    if errors:
+        raise_validation_errors(errors, position)
+
+    return new_values
+
+
+def check_payload_size(value, position, max_depth=None, max_nodes=None):
+    '''
+    Walk JSON decoded value by an explicit stack, raise PAYLOAD_TOO_DEEP if
+    objects / arrays nest deeper than max_depth levels, or PAYLOAD_TOO_LARGE
+    if objects / arrays hold more than max_nodes values in total.
+    '''
+    if type(value) not in (dict, list):
+        return
+
+    node_count = 0
+    # (container, depth, (key, parent entry))
+    stack = [(value, 1, None)]
+    while stack:
+        entry = stack.pop()
+        container, depth, _ = entry
+
+        node_count += len(container)
+        if max_nodes is not None and node_count > max_nodes:
+            raise SchemaValidationError(
+                None, 'PAYLOAD_TOO_LARGE', constraint=max_nodes, position=position
+            )
+
+        items = (
+            six.iteritems(container)
+            if type(container) is dict
+            else enumerate(container)
+        )
+        for key, child in items:
+            child_type = type(child)
+            if child_type is not dict and child_type is not list:
+                continue
+
+            if max_depth is not None and depth >= max_depth:
+                keys = [key]
+                parent_link = entry[2]
+                while parent_link is not None:
+                    keys.append(parent_link[0])
+                    parent_link = parent_link[1][2]
+
+                raise SchemaValidationError(
+                    None,
+                    'PAYLOAD_TOO_DEEP',
+                    constraint=max_depth,
+                    position=position + keys[::-1],
+                )
 
+            stack.append((child, depth + 1, (key, entry)))
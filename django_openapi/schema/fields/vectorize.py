@@ -0,0 +1,134 @@
+# -*- coding:utf-8 -*-
+'''
+Optional NumPy vectorized validation of large number arrays.
+
+All helpers here are no-op when NumPy isn't installed.
+'''
+
+from __future__ import unicode_literals
+from __future__ import print_function
+
+import six
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from .exceptions import SchemaValidationError
+from .number import NumberField
+from .integer import IntegerField
+
+# arrays shorter than this are not worth the conversion cost
+VECTORIZE_MIN_ITEMS = 256
+
+_NUMBER_TYPES = six.integer_types + (float,)
+
+# ints beyond this lose precision in float64
+_MAX_EXACT_FLOAT_INT = 2**53
+_INT64_RANGE = (-(2**63), 2**63 - 1)
+
+ndarray_type = numpy.ndarray if numpy is not None else None
+
+
+def is_vectorizable(item_field):
+    return (
+        numpy is not None
+        and type(item_field) in (NumberField, IntegerField)
+        and (
+            not item_field.enums
+            or all(
+                isinstance(v, _NUMBER_TYPES) and not isinstance(v, bool)
+                for v in item_field.enums
+            )
+        )
+    )
+
+
+def parse_number_array(field, values, position, max_errors=1):
+    '''
+    Validate values against constraints of NumberField field by array ops.
+
+    Returns (ndarray, errors), or (None, None) when values couldn't be
+    converted into a 1-d numeric array (e.g. holds None, text or big ints)
+    or compared exactly with constraints, then caller should fall back to
+    parse items one by one.
+
+    Errors of the first max_errors invalid items are reported by
+    field.parse(), so they are the same as parsing items one by one.
+    '''
+    try:
+        arr = numpy.asarray(values)
+    except (TypeError, ValueError, OverflowError):
+        return None, None
+
+    is_integer = isinstance(field, IntegerField)
+    if arr.ndim != 1 or arr.dtype.kind not in ('iu' if is_integer else 'biuf'):
+        return None, None
+
+    # numpy silently turns bools mixed with ints into ints
+    if is_integer and bool in set(map(type, values)):
+        return None, None
+
+    try:
+        invalid = _find_invalid_items(field, arr, is_integer)
+    except (OverflowError, TypeError):
+        return None, None
+
+    if invalid is None:
+        return None, None
+
+    errors = []
+    for idx in numpy.flatnonzero(invalid):
+        idx = int(idx)
+        try:
+            field.parse(values[idx], position + [idx])
+        except SchemaValidationError as e:
+            errors.append(e)
+            if len(errors) >= max_errors:
+                break
+
+    return arr, errors
+
+
+def _find_invalid_items(field, arr, is_integer):
+    '''
+    Return bool array marking invalid items, or None if arr and constraints
+    of field can't be compared exactly in the array dtype.
+    '''
+    constraints = [
+        c
+        for c in (field.gt, field.gte, field.lt, field.lte, field.multiple_of)
+        if c is not None
+    ]
+    constraints.extend(field.enums or ())
+
+    if arr.dtype.kind == 'f' or any(isinstance(c, float) for c in constraints):
+        # compared in float64, e.g. big ints mixed with floats lose precision
+        if len(arr) and not numpy.abs(arr).max() <= _MAX_EXACT_FLOAT_INT:
+            return None
+        int_range = (-_MAX_EXACT_FLOAT_INT, _MAX_EXACT_FLOAT_INT)
+    else:
+        int_range = _INT64_RANGE
+
+    for c in constraints:
+        if isinstance(c, six.integer_types) and not int_range[0] <= c <= int_range[1]:
+            return None
+
+    invalid = numpy.zeros(len(arr), dtype=bool)
+    if is_integer and field.int_range is not None:
+        invalid |= (arr < field.int_range[0]) | (arr > field.int_range[1])
+    if field.enums:
+        invalid |= ~numpy.isin(arr, field.enums)
+    if field.gt is not None:
+        invalid |= ~(arr > field.gt)
+    if field.gte is not None:
+        invalid |= ~(arr >= field.gte)
+    if field.lt is not None:
+        invalid |= ~(arr < field.lt)
+    if field.lte is not None:
+        invalid |= ~(arr <= field.lte)
+    if field.multiple_of is not None:
+        invalid |= numpy.mod(arr, field.multiple_of) != 0
+
+    return invalid
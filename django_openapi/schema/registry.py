@@ -0,0 +1,77 @@
+# -*- coding:utf-8 -*-
+from __future__ import unicode_literals
+from __future__ import print_function
+
+from collections import OrderedDict
+from threading import Lock
+
+import six
+
+
+def iter_model_closure(models, seen):
+    '''
+    Yield models and all models referenced by them transitively, skipping
+    models in seen. Yielded models are added into seen.
+    '''
+    # walk referenced models by an explicit stack
+    stack = list(reversed(models))
+    while stack:
+        model_cls = stack.pop()
+        if model_cls in seen:
+            continue
+
+        seen.add(model_cls)
+        yield model_cls
+        stack.extend(reversed(model_cls.get_referenced_models()))
+
+
+class SchemaRegistry(object):
+    '''
+    Schema components of models reachable from routes of one OpenAPI.
+
+    Models are collected incrementally when routes are added. Each update
+    publishes a new `snapshot` dict (ref name -> schema) which is never
+    mutated afterwards, so readers could use it without locking.
+
+    Ref names of models are still decided globally by BaseModel, so the
+    same model has the same ref name in all registries.
+    '''
+
+    def __init__(self):
+        self.snapshot = OrderedDict()
+        self._model_set = set()
+        self._lock = Lock()
+
+    def __contains__(self, model_cls):
+        return model_cls in self._model_set
+
+    def add_models(self, models):
+        with self._lock:
+            new_models = list(iter_model_closure(models, self._model_set))
+
+            if not new_models:
+                return
+
+            snapshot = OrderedDict(self.snapshot)
+            for model_cls in new_models:
+                snapshot[model_cls.get_json_schema_ref()] = model_cls.get_json_schema()
+            self.snapshot = snapshot
+
+    def add_route(self, route):
+        self.add_models(route.get_referenced_models())
+
+    def get_schemas(self, models):
+        '''
+        Return schemas of models and models referenced by them, in the same
+        order as snapshot.
+        '''
+        snapshot = self.snapshot
+        ref_set = set(
+            model_cls.get_json_schema_ref()
+            for model_cls in iter_model_closure(models, set())
+        )
+        return OrderedDict(
+            (ref, schema_d)
+            for ref, schema_d in six.iteritems(snapshot)
+            if ref in ref_set
+        )
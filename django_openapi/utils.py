@@ -3,10 +3,82 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+from collections import OrderedDict
+from threading import Lock
+
+import six
 from django.http import JsonResponse
 
+# RecursionError is added in python 3.5, older ones raise RuntimeError
+_RecursionError = getattr(six.moves.builtins, 'RecursionError', None)
+RECURSION_ERRORS = (_RecursionError or RuntimeError,)
+
+
+def is_recursion_error(e):
+    '''
+    Tell if exception e caught by `except RECURSION_ERRORS` is raised for
+    exceeding the recursion limit.
+    '''
+    if _RecursionError is not None:
+        return True
+
+    return 'maximum recursion depth' in six.text_type(e)
+
 
 def json_response(data, status_code=200):
     resp = JsonResponse(data)
     resp.status_code = status_code
     return resp
+
+
+class LRUCache(object):
+    '''
+    Thread safe bounded LRU mapping, with hit/miss/eviction counters for sizing.
+    '''
+
+    def __init__(self, max_size):
+        assert isinstance(max_size, int) and max_size > 0, 'max_size must > 0'
+
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._data.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+
+            self._data[key] = value
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = value
+
+            if len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._data),
+            'max_size': self.max_size,
+        }
+
+    def __len__(self):
+        return len(self._data)
@@ -0,0 +1,651 @@
+import gzip
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.http import Http404
+from django.test import RequestFactory, SimpleTestCase
+from six import StringIO
+from six.moves.urllib.error import URLError
+
+from django_openapi import OpenAPI, APIRouter, Path, Body, Form
+from django_openapi.schema import (
+    BaseModel,
+    NumberField,
+    StringField,
+    ObjectField,
+    ArrayField,
+    SchemaValidationError,
+)
+from django_openapi.schema.base import to_json_value
+from django_openapi.schema.fields.exceptions import DeferredSchemaValidationError
+from django_openapi import utils
+from django_openapi.utils import LRUCache
+from django_openapi.route import PATH_NOT_FULL_FILLED
+from django_openapi.management.commands import openapi_export
+from django_openapi.management.commands.openapi_export import Command
+
+
+class SampleResponse(BaseModel):
+    uid = NumberField()
+
+
+class TestRouteTree(SimpleTestCase):
+    def setUp(self):
+        self.api = api = OpenAPI()
+
+        @api.get('/users/{uid}')
+        def get_user(uid=Path()):
+            pass
+
+        @api.get('/users/me')
+        def get_me():
+            pass
+
+        @api.get('/users/{uid}/posts/{pid}')
+        def get_user_post(uid=Path(), pid=Path()):
+            pass
+
+        @api.get('/files/{name}.json')
+        def get_file(name=Path()):
+            pass
+
+    def assert_same_as_linear_scan(self, request_path):
+        expected = []
+        for route in self.api.routes:
+            path_kwargs = route.match_path(request_path)
+            if path_kwargs is not PATH_NOT_FULL_FILLED:
+                expected.append((route, path_kwargs))
+
+        self.assertEqual(self.api.route_tree.match(request_path), expected)
+        return expected
+
+    def test_match(self):
+        for request_path in (
+            '/users/42',
+            '/users/me',
+            '/users/42/posts/7',
+            '/files/a.json',
+            '/files/a.yaml',
+            '/files/aXjson',
+            '/users/42\n',
+            '/users',
+            '/users//posts/7',
+            '/unknown',
+        ):
+            self.assert_same_as_linear_scan(request_path)
+
+    def test_register_order_priority(self):
+        matched = self.assert_same_as_linear_scan('/users/me')
+        self.assertEqual(
+            [route.route_path for route, _ in matched], ['/users/{uid}', '/users/me']
+        )
+        self.assertEqual(matched[0][1], {'uid': 'me'})
+
+    def test_static_path_map(self):
+        route_tree = self.api.route_tree
+        self.assertEqual(route_tree.static_path_set, {'/users/me'})
+
+        # built on first lookup
+        self.assertNotIn('/users/me', route_tree.static_path_map)
+        route_tree.resolve('GET', '/users/me')
+        self.assertIn('/users/me', route_tree.static_path_map)
+
+        @self.api.get('/health')
+        def health():
+            pass
+
+        @self.api.get('/{name}')
+        def get_by_name(name=Path()):
+            pass
+
+        # parameterized route registered later still shows up for static path
+        matched = self.assert_same_as_linear_scan('/health')
+        self.assertEqual(
+            [route.route_path for route, _ in matched], ['/health', '/{name}']
+        )
+
+        # and drops built static entries
+        self.assertNotIn('/users/me', route_tree.static_path_map)
+        route, path_kwargs, _ = route_tree.resolve('GET', '/users/me')
+        self.assertEqual(route.route_path, '/users/{uid}')
+        self.assertEqual(path_kwargs, {'uid': 'me'})
+        path_kwargs['uid'] = 'changed'
+        self.assertEqual(route_tree.resolve('GET', '/users/me')[1], {'uid': 'me'})
+
+    def test_resolve_method(self):
+        @self.api.post('/users/{name}')
+        def create_user(name=Path()):
+            pass
+
+        tree = self.api.route_tree
+        route, path_kwargs, _ = tree.resolve('POST', '/users/me')
+        self.assertEqual(route.route_path, '/users/{name}')
+        self.assertEqual(path_kwargs, {'name': 'me'})
+
+        route, path_kwargs, _ = tree.resolve('GET', '/users/42')
+        self.assertEqual(route.route_path, '/users/{uid}')
+        self.assertEqual(path_kwargs, {'uid': '42'})
+
+        self.assertEqual(
+            tree.resolve('DELETE', '/users/me'), (None, None, ('GET', 'POST'))
+        )
+        self.assertEqual(tree.resolve('GET', '/unknown'), (None, None, tuple()))
+
+    def test_dispatch_not_allowed(self):
+        view = self.api.as_django_view()
+        request_factory = RequestFactory()
+
+        resp = view(request_factory.head('/users/42'), '/users/42')
+        self.assertEqual(resp.status_code, 405)
+        self.assertEqual(resp['Allow'], 'GET')
+
+        with self.assertRaises(Http404):
+            view(request_factory.get('/unknown'), '/unknown')
+
+
+class TestPathConverter(SimpleTestCase):
+    def setUp(self):
+        self.api = api = OpenAPI(prefix_path='/api')
+
+        @api.get('/users/{uid:int}')
+        def get_user(uid=Path(NumberField())):
+            return {'uid': uid}
+
+        @api.get('/users/{name:slug}')
+        def get_user_by_name(name=Path()):
+            return {'name': name}
+
+        @api.get('/orders/{oid:uuid}')
+        def get_order(oid=Path()):
+            return {'oid': oid}
+
+    def test_match(self):
+        tree = self.api.route_tree
+        self.assertEqual(tree.resolve('GET', '/users/42')[1], {'uid': 42})
+        self.assertEqual(tree.resolve('GET', '/users/abc')[1], {'name': 'abc'})
+        self.assertEqual(tree.resolve('GET', '/users/a.b'), (None, None, tuple()))
+        # too long for int converter, falls to slug route
+        self.assertEqual(
+            tree.resolve('GET', '/users/' + '9' * 5000)[0].fn.__name__,
+            'get_user_by_name',
+        )
+        self.assertEqual(
+            tree.resolve('GET', '/orders/0A2B3C4D-0000-1111-2222-333344445555')[1],
+            {'oid': '0a2b3c4d-0000-1111-2222-333344445555'},
+        )
+        self.assertEqual(tree.resolve('GET', '/orders/42'), (None, None, tuple()))
+        self.assertEqual(self.api.routes[0].match_path('/users/42'), {'uid': 42})
+
+    def test_openapi_path(self):
+        self.assertEqual(
+            list(self.api.get_openapi_schema()['paths']),
+            ['/api/users/{uid}', '/api/users/{name}', '/api/orders/{oid}'],
+        )
+
+    def test_int_converter_field(self):
+        with self.assertRaises(AssertionError):
+
+            @self.api.get('/posts/{pid:int}')
+            def get_post(pid=Path()):
+                pass
+
+
+class TestRouteCache(SimpleTestCase):
+    def test_lru_cache(self):
+        cache = LRUCache(2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+        cache.set('c', 3)  # evicts b
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(
+            cache.stats(),
+            {'hits': 1, 'misses': 1, 'evictions': 1, 'size': 2, 'max_size': 2},
+        )
+
+    def test_route_cache(self):
+        api = OpenAPI(route_cache_size=10)
+
+        @api.get('/users/{uid}')
+        def get_user(uid=Path()):
+            pass
+
+        resolved = api.route_tree.resolve('GET', '/users/42')
+        resolved[1]['uid'] = 'changed'
+        self.assertEqual(api.route_tree.resolve('GET', '/users/42')[1], {'uid': '42'})
+        self.assertEqual(api.route_cache.hits, 1)
+
+        # not found paths and not allowed methods never go into route cache
+        api.route_tree.resolve('GET', '/unknown')
+        self.assertEqual(api.route_tree.resolve('DELETE', '/users/7')[2], ('GET',))
+        self.assertEqual(len(api.route_cache), 1)
+        self.assertIsNone(api.not_found_route_cache)
+
+        # cache is invalidated when routes added
+        @api.get('/users/{uid}/posts')
+        def get_user_posts(uid=Path()):
+            pass
+
+        self.assertEqual(len(api.route_cache), 0)
+
+    def test_not_found_route_cache(self):
+        api = OpenAPI(route_cache_size=10, not_found_route_cache_size=1)
+
+        api.route_tree.resolve('GET', '/a')
+        api.route_tree.resolve('GET', '/b')
+        self.assertEqual(api.route_tree.resolve('GET', '/b'), (None, None, tuple()))
+        self.assertEqual(api.not_found_route_cache.stats()['evictions'], 1)
+        self.assertEqual(api.not_found_route_cache.hits, 1)
+        self.assertEqual(len(api.route_cache), 0)
+
+
+class TestAPIRouter(SimpleTestCase):
+    def test_include_router(self):
+        user_router = APIRouter()
+
+        @user_router.get('/{uid:int}', tags=['user'])
+        def get_user(uid=Path(NumberField())):
+            return {'uid': uid}
+
+        @user_router.post('/')
+        def create_user():
+            return {}
+
+        admin_router = APIRouter()
+        admin_router.include_router(user_router, prefix='/users/')
+
+        api = OpenAPI(prefix_path='/api')
+        api.include_router(admin_router, prefix='admin', tags=['admin'])
+
+        self.assertEqual(
+            [(route.route_path, route.tags) for route in api.routes],
+            [
+                ('/admin/users/{uid:int}', ['admin', 'user']),
+                ('/admin/users', ['admin']),
+            ],
+        )
+
+        route, path_kwargs, _ = api.route_tree.resolve('GET', '/admin/users/42')
+        self.assertIs(route.fn, get_user)
+        self.assertEqual(path_kwargs, {'uid': 42})
+        self.assertIn('/api/admin/users', api.get_openapi_schema()['paths'])
+
+
+class TestResponseValidation(SimpleTestCase):
+    def setUp(self):
+        self.api = api = OpenAPI(response_validation='never')
+
+        @api.get('/never', response_model=SampleResponse)
+        def never():
+            return {'uid': 'abc'}
+
+        @api.get('/always', response_model=SampleResponse, response_validation='always')
+        def always():
+            return {'uid': 'abc'}
+
+        @api.get('/sample', response_model=SampleResponse, response_validation=1.0)
+        def sample():
+            return {'uid': 'abc'}
+
+        self.view = api.as_django_view()
+        self.request_factory = RequestFactory()
+
+    def get(self, path):
+        return self.view(self.request_factory.get(path), path)
+
+    def test_policy(self):
+        self.assertEqual(
+            [route.response_validation for route in self.api.routes],
+            ['never', 'always', 1.0],
+        )
+
+        # any real number between 0 ~ 1 is a sample rate, bools are not
+        self.api.get('/zero', response_validation=0)(lambda: None)
+        self.assertEqual(self.api.routes[-1].response_validation, 0)
+
+        for bad_policy in ('sometimes', True, 2):
+            with self.assertRaises(AssertionError):
+                self.api.get('/bad', response_validation=bad_policy)(lambda: None)
+
+    def test_never(self):
+        resp = self.get('/never')
+        self.assertEqual(json.loads(resp.content), {'uid': 'abc'})
+
+    def test_always(self):
+        with self.assertRaises(SchemaValidationError):
+            self.get('/always')
+
+    def test_sample(self):
+        route = self.api.routes[2]
+        with self.assertLogs('django_openapi.route', 'WARNING'):
+            resp = self.get('/sample')
+
+        self.assertEqual(json.loads(resp.content), {'uid': 'abc'})
+        self.assertEqual(route.response_validation_count, 1)
+        self.assertEqual(route.response_validation_error_count, 1)
+
+    def test_lazy_response_model(self):
+        class LazyResponse(BaseModel):
+            class Config:
+                lazy = True
+
+            items = ArrayField(ObjectField(SampleResponse))
+
+        @self.api.get(
+            '/lazy_sample', response_model=LazyResponse, response_validation=1
+        )
+        def lazy_sample():
+            return {'items': [{'uid': 'abc'}]}
+
+        @self.api.get(
+            '/lazy_always', response_model=LazyResponse, response_validation='always'
+        )
+        def lazy_always():
+            return {'items': [{'uid': 'abc'}]}
+
+        # response errors are never reported as 422 of request
+        with self.assertLogs('django_openapi.route', 'WARNING'):
+            resp = self.get('/lazy_sample')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(self.api.routes[-2].response_validation_error_count, 1)
+
+        with self.assertRaises(SchemaValidationError) as cm:
+            self.get('/lazy_always')
+        self.assertNotIsInstance(cm.exception, DeferredSchemaValidationError)
+
+
+class TestBodyLimits(SimpleTestCase):
+    def setUp(self):
+        api = OpenAPI()
+
+        @api.post('/limited')
+        def limited(body=Body(SampleResponse, max_depth=3, max_nodes=10)):
+            return {}
+
+        @api.post('/unlimited')
+        def unlimited(body=Body(SampleResponse)):
+            return {}
+
+        self.view = api.as_django_view()
+        self.request_factory = RequestFactory()
+
+    def post(self, path, body):
+        request = self.request_factory.post(path, body, content_type='application/json')
+        return self.view(request, path)
+
+    def assert_error(self, resp, err_type, loc):
+        self.assertEqual(resp.status_code, 422)
+        self.assertEqual(
+            json.loads(resp.content)['detail'],
+            [{'loc': loc, 'type': err_type, 'msg': err_type}],
+        )
+
+    def test_limits(self):
+        resp = self.post('/limited', json.dumps({'uid': 1, 'extra': [[1]]}))
+        self.assertEqual(resp.status_code, 200)
+
+        self.assert_error(
+            self.post('/limited', json.dumps({'uid': 1, 'extra': [[[1]]]})),
+            'PAYLOAD_TOO_DEEP',
+            ['body', 'body', 'extra', 0, 0],
+        )
+        self.assert_error(
+            self.post('/limited', json.dumps({'uid': 1, 'extra': list(range(10))})),
+            'PAYLOAD_TOO_LARGE',
+            ['body', 'body'],
+        )
+
+    def test_recursion_limit(self):
+        depth = sys.getrecursionlimit() * 2
+        self.assert_error(
+            self.post(
+                '/unlimited', '{"uid": 1, "extra": ' + '[' * depth + ']' * depth + '}'
+            ),
+            'PAYLOAD_TOO_DEEP',
+            ['body', 'body'],
+        )
+
+    def test_deep_json_value(self):
+        value = []
+        for _ in range(sys.getrecursionlimit() * 2):
+            value = [{'a': value}]
+
+        json_value = to_json_value(value)
+        for _ in range(sys.getrecursionlimit() * 2):
+            json_value = json_value[0]['a']
+        self.assertEqual(json_value, [])
+
+    def test_python2_recursion_error(self):
+        # RuntimeError is only a recursion error by its message before python 3.5
+        self.addCleanup(setattr, utils, '_RecursionError', utils._RecursionError)
+        utils._RecursionError = None
+
+        self.assertTrue(
+            utils.is_recursion_error(RuntimeError('maximum recursion depth exceeded'))
+        )
+        self.assertFalse(utils.is_recursion_error(RuntimeError('other error')))
+
+
+class TestLazyBody(SimpleTestCase):
+    def test_deferred_error_response(self):
+        class Item(BaseModel):
+            code = StringField(regex=r'^[A-Z]+$')
+
+        class Order(BaseModel):
+            class Config:
+                lazy = True
+
+            uid = NumberField()
+            items = ArrayField(ObjectField(Item))
+
+        api = OpenAPI()
+
+        @api.post('/orders')
+        def create_order(order=Body(Order)):
+            return {'uid': order.uid, 'count': len(order.items)}
+
+        request = RequestFactory().post(
+            '/orders',
+            json.dumps({'uid': 1, 'items': [{'code': 'A'}, {'code': 'b'}]}),
+            content_type='application/json',
+        )
+        resp = api.as_django_view()(request, '/orders')
+        self.assertEqual(resp.status_code, 422)
+        self.assertEqual(
+            json.loads(resp.content)['detail'][0]['loc'],
+            ['body', 'order', 'items', 1, 'code'],
+        )
+
+        # lazy body passed through unread is still a request error
+        @api.post('/orders/echo')
+        def echo_order(order=Body(Order)):
+            return order
+
+        request = RequestFactory().post(
+            '/orders/echo',
+            json.dumps({'uid': 1, 'items': [{'code': 'a'}]}),
+            content_type='application/json',
+        )
+        resp = api.as_django_view()(request, '/orders/echo')
+        self.assertEqual(resp.status_code, 422)
+        self.assertEqual(
+            json.loads(resp.content)['detail'][0]['loc'],
+            ['body', 'order', 'items', 0, 'code'],
+        )
+
+
+class TestOpenAPISpec(SimpleTestCase):
+    def setUp(self):
+        self.api = api = OpenAPI(prefix_path='/api')
+
+        @api.get('/users/{uid}')
+        def get_user(uid=Path()):
+            pass
+
+        self.view = api.as_django_view()
+        self.request_factory = RequestFactory()
+
+    def get_spec(self, **headers):
+        return self.view(
+            self.request_factory.get('/api/_openapi.json', **headers), '/_openapi.json'
+        )
+
+    def test_cached_spec(self):
+        resp = self.get_spec()
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(json.loads(resp.content), self.api.get_openapi_schema())
+        self.assertEqual(resp['Cache-Control'], 'no-cache')
+        self.assertIs(self.api.get_openapi_spec_cache(), self.api.spec_cache)
+
+        etag = resp['ETag']
+        resp = self.get_spec(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp['ETag'], etag)
+
+        resp = self.get_spec(HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(resp['Content-Encoding'], 'gzip')
+        self.assertNotEqual(resp['ETag'], etag)
+        self.assertEqual(
+            json.loads(gzip.decompress(resp.content)), self.api.get_openapi_schema()
+        )
+
+        for accept_encoding in ('gzip;q=0, deflate', 'deflate', '*;q=0', 'identity'):
+            resp = self.get_spec(HTTP_ACCEPT_ENCODING=accept_encoding)
+            self.assertFalse(resp.has_header('Content-Encoding'), accept_encoding)
+        resp = self.get_spec(HTTP_ACCEPT_ENCODING='GZIP;q=0.5, *;q=0')
+        self.assertEqual(resp['Content-Encoding'], 'gzip')
+
+        # spec is rebuilt after routes added
+        @self.api.get('/users')
+        def list_users():
+            pass
+
+        resp = self.get_spec(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn('/api/users', json.loads(resp.content)['paths'])
+
+    def test_filtered_spec(self):
+        class FilterAdmin(BaseModel):
+            name = StringField()
+
+        class FilterAdminList(BaseModel):
+            admins = ArrayField(ObjectField(FilterAdmin))
+
+        @self.api.get('/admin/users', tags=['admin'], response_model=FilterAdminList)
+        def list_admins():
+            pass
+
+        resp = self.view(
+            self.request_factory.get('/api/_openapi.json', {'tags': 'admin, billing'}),
+            '/_openapi.json',
+        )
+        spec_d = json.loads(resp.content)
+        self.assertEqual(list(spec_d['paths']), ['/api/admin/users'])
+        self.assertEqual(
+            sorted(spec_d['components']['schemas']),
+            [
+                'FilterAdmin',
+                'FilterAdminList',
+                'ValidationErrorItem',
+                'ValidationErrorResponse',
+            ],
+        )
+        self.assertIs(
+            self.api.get_openapi_spec_cache(tags=['billing', 'admin']),
+            self.api.get_openapi_spec_cache(tags=['admin', 'billing']),
+        )
+        self.assertEqual(
+            self.api.get_openapi_schema(path_prefix='/admin'),
+            self.api.get_openapi_schema(tags=['admin']),
+        )
+
+        resp = self.view(
+            self.request_factory.get('/api/_redoc', {'path_prefix': '/admin'}),
+            '/_redoc',
+        )
+        self.assertIn(b'/api/_openapi.json?path_prefix=%2Fadmin', resp.content)
+
+
+class TestOpenAPIExport(SimpleTestCase):
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.output_dir)
+
+    def test_export(self):
+        from demo.intro import api
+
+        call_command(Command(), self.output_dir, stdout=StringIO())
+
+        api_dir = os.path.join(self.output_dir, 'intro')
+        spec_path = os.path.join(api_dir, '_openapi.json')
+        with open(spec_path, 'rb') as f:
+            self.assertEqual(json.loads(f.read()), api.get_openapi_schema())
+        self.assertTrue(os.path.exists(os.path.join(api_dir, '_redoc', 'index.html')))
+
+        # exported spec served in place of generated one
+        exported_api = OpenAPI(prefix_path='/intro', spec_file=spec_path)
+        resp = exported_api.openapi_spec_response(
+            RequestFactory().get('/intro/_openapi.json', HTTP_ACCEPT_ENCODING='gzip')
+        )
+        with open(spec_path + '.gz', 'rb') as f:
+            self.assertEqual(resp.content, f.read())
+        self.assertEqual(resp['ETag'], api.get_openapi_spec_cache().gzip_etag)
+
+    def test_vendor_assets_error(self):
+        def urlopen(url, timeout=None):
+            self.assertIsNotNone(timeout)
+            raise URLError('offline')
+
+        self.addCleanup(setattr, openapi_export, 'urlopen', openapi_export.urlopen)
+        openapi_export.urlopen = urlopen
+
+        with self.assertRaises(CommandError):
+            call_command(
+                Command(), self.output_dir, vendor_assets=True, stdout=StringIO()
+            )
+
+
+class TestSchemaRegistry(SimpleTestCase):
+    def test_components(self):
+        class RegistryItem(BaseModel):
+            code = StringField()
+
+        class RegistryOrder(BaseModel):
+            items = ArrayField(ObjectField(RegistryItem))
+
+        class RegistryUser(BaseModel):
+            name = StringField()
+
+        order_api = OpenAPI()
+        user_api = OpenAPI()
+
+        @order_api.post('/orders', response_model=RegistryOrder)
+        def create_order(order=Body(RegistryOrder)):
+            pass
+
+        @user_api.get('/users', response_model=RegistryUser)
+        def get_user():
+            pass
+
+        snapshot = user_api.schema_registry.snapshot
+
+        @user_api.post('/users/upload')
+        def upload_user(name=Form()):
+            pass
+
+        error_refs = ['ValidationErrorResponse', 'ValidationErrorItem']
+        self.assertEqual(
+            list(order_api.get_openapi_schema()['components']['schemas']),
+            ['RegistryOrder', 'RegistryItem'] + error_refs,
+        )
+        self.assertEqual(
+            list(user_api.get_openapi_schema()['components']['schemas']),
+            ['RegistryUser'] + error_refs + ['_users_upload_body_form', 'BaseModel'],
+        )
+        # published snapshots are never mutated
+        self.assertEqual(list(snapshot), ['RegistryUser'] + error_refs)
@@ -0,0 +1,634 @@
+import copy
+from datetime import datetime, date
+from decimal import Decimal
+from unittest import skipIf
+from uuid import UUID
+
+from django.test import SimpleTestCase
+from django.utils.timezone import utc
+
+from django_openapi.schema import (
+    BaseModel,
+    StringField,
+    NumberField,
+    IntegerField,
+    BooleanField,
+    ObjectField,
+    ArrayField,
+    UnionField,
+    DateTimeField,
+    DateField,
+    UUIDField,
+    DecimalField,
+    SchemaValidationError,
+)
+from django_openapi.schema.fields.exceptions import DeferredSchemaValidationError
+from django_openapi.schema.fields.formats import BaseFormatField
+from django_openapi.schema.base import to_json_value
+from django_openapi.schema.fields.vectorize import VECTORIZE_MIN_ITEMS, ndarray_type
+
+
+class SampleItem(BaseModel):
+    code = StringField(regex=r'^[A-Z]+$')
+
+
+class SampleModel(BaseModel):
+    name = StringField(min_length=2, max_length=5)
+    kind = StringField(enums=['a', 'b'], default_value='a')
+    note = StringField(required=False)
+    age = NumberField(gte=0, lt=150, multiple_of=1)
+    score = NumberField(enums=[1, 2.5], required=False)
+    active = BooleanField(default_value=False)
+    item = ObjectField(SampleItem, required=False)
+    items = ArrayField(ObjectField(SampleItem), required=False)
+
+
+def generic_validate(model_cls, kwargs):
+    # the former field.parse() loop of BaseModel.__init__
+    value_d = {}
+    for name, field in model_cls.iter_schema_fields():
+        value_d[name] = field.parse(kwargs.get(name, None), [name])
+    return value_d
+
+
+class TestBaseModel(SimpleTestCase):
+    def test_schema_fields(self):
+        class Parent(BaseModel):
+            name = StringField()
+            age = NumberField()
+
+        class Child(Parent):
+            age = None  # not a schema field anymore
+            title = StringField(required=False)
+
+        self.assertEqual(
+            [name for name, _ in Child.iter_schema_fields()], ['name', 'title']
+        )
+        self.assertIsNone(Child.get_schema_field('age'))
+
+        # fields assigned after class creation are picked up by sub classes too
+        Parent.email = StringField(required=False)
+        self.assertEqual(
+            [name for name, _ in Child.iter_schema_fields()], ['email', 'name', 'title']
+        )
+
+        child = Child(name='toki', extra=1)
+        self.assertEqual(
+            child.to_json_dict(),
+            {'email': None, 'name': 'toki', 'title': None, 'extra': 1},
+        )
+        self.assertIs(Child.parse(child), child)
+
+        class OtherChild(Child):
+            pass
+
+        self.assertEqual(OtherChild.parse(child).to_json_dict(), child.to_json_dict())
+
+    def test_compiled_validator(self):
+        valid_kwargs = dict(name='toki', age=20, item={'code': 'A'}, items=[])
+        for update_d in (
+            {},
+            {'name': b'toki'},
+            {'name': 't'},
+            {'name': 'tokikanno'},
+            {'name': 5},
+            {'name': None},
+            {'kind': 'c'},
+            {'kind': None},
+            {'age': '20'},
+            {'age': '20.5'},
+            {'age': 'abc'},
+            {'age': -1},
+            {'age': 150},
+            {'age': 1.5},
+            {'score': 2.5},
+            {'score': 3},
+            {'active': 'yes'},
+            {'active': 'maybe'},
+            {'item': {'code': 'a'}},
+            {'items': [{'code': 'A'}, {'code': 'b'}]},
+            {'extra': [1, 2]},
+        ):
+            kwargs = dict(valid_kwargs, **update_d)
+            try:
+                expected = generic_validate(SampleModel, kwargs)
+            except SchemaValidationError as e:
+                with self.assertRaises(SchemaValidationError) as ctx:
+                    SampleModel(**kwargs)
+                self.assertEqual(repr(ctx.exception), repr(e))
+                continue
+
+            json_d = SampleModel(**kwargs).to_json_dict()
+            for name, value in expected.items():
+                if isinstance(value, BaseModel):
+                    value = value.to_json_dict()
+                elif isinstance(value, list):
+                    value = [v.to_json_dict() for v in value]
+                self.assertEqual(json_d.pop(name), value)
+            self.assertEqual(
+                json_d, {k: v for k, v in update_d.items() if k == 'extra'}
+            )
+
+    def test_compact_model(self):
+        class CompactItem(SampleItem):
+            class Config:
+                compact = True
+
+            label = StringField(required=False)
+
+        self.assertEqual(CompactItem.__slots__, ('code', 'label', '_extras'))
+        self.assertEqual(
+            [name for name, _ in CompactItem.iter_schema_fields()], ['code', 'label']
+        )
+
+        item = CompactItem(code='A', extra=1)
+        self.assertEqual(item.code, 'A')
+
+        class CompactRoot(BaseModel):
+            class Config:
+                compact = True
+
+            code = StringField()
+
+        root = CompactRoot(code='A')
+        self.assertFalse(hasattr(root, '__dict__'))
+        with self.assertRaises(AttributeError):
+            root.label = 'a'
+        self.assertEqual(item.to_json_dict(), {'code': 'A', 'label': None, 'extra': 1})
+        self.assertEqual(SampleItem.parse(item).to_json_dict(), item.to_json_dict())
+
+        class CompactChild(CompactItem):
+            value = NumberField()
+
+        self.assertEqual(CompactChild.__slots__, ('value',))
+        child = CompactChild(code='A', value=1)
+        self.assertEqual(child.to_json_dict(), {'code': 'A', 'label': None, 'value': 1})
+
+        with self.assertRaises(SchemaValidationError) as ctx:
+            CompactChild(code='a', value=1)
+        self.assertEqual(ctx.exception.position, ['code'])
+
+    def test_extra_policy(self):
+        class IgnoreItem(SampleItem):
+            class Config:
+                extra = 'ignore'
+
+        class ForbidItem(SampleItem):
+            class Config:
+                extra = 'forbid'
+
+        self.assertEqual(IgnoreItem(code='A', extra=1).to_json_dict(), {'code': 'A'})
+
+        with self.assertRaises(SchemaValidationError) as ctx:
+            ForbidItem(code='A', extra=1)
+        self.assertEqual(ctx.exception.err_type, 'ADDITIONAL_PROPERTY_NOT_ALLOWED')
+        self.assertEqual(ctx.exception.position, ['extra'])
+        self.assertIs(ForbidItem.get_json_schema()['additionalProperties'], False)
+
+    def test_nested_model_schema_ref(self):
+        ref = '#/components/schemas/' + SampleItem.get_json_schema_ref()
+        properties = SampleModel.get_json_schema()['properties']
+        self.assertEqual(properties['item'], {'$ref': ref})
+        self.assertEqual(properties['items']['items'], {'$ref': ref})
+
+        field = ObjectField(SampleItem, description='the item')
+        self.assertEqual(
+            field.get_json_schema(), {'description': 'the item', 'allOf': [{'$ref': ref}]}
+        )
+
+    def test_compiled_serializer(self):
+        model = SampleModel(
+            name='toki',
+            age=20,
+            item={'code': 'A'},
+            items=[{'code': 'B'}],
+            extra={'nested': [SampleItem(code='C'), (1, 2)]},
+        )
+        json_d = model.to_json_dict()
+        self.assertEqual(
+            json_d, {k: to_json_value(v) for k, v in model._iter_value_items()}
+        )
+        self.assertEqual(json_d['items'], [{'code': 'B'}])
+        self.assertEqual(json_d['extra'], {'nested': [{'code': 'C'}, [1, 2]]})
+
+        # unexpected values assigned after validation are still converted
+        model.items = (SampleItem(code='D'),)
+        del model.note
+        json_d = model.to_json_dict()
+        self.assertEqual(json_d['items'], [{'code': 'D'}])
+        self.assertNotIn('note', json_d)
+
+    def test_construct_and_copy(self):
+        model = SampleModel.construct(name='toki', age=20, extra=1)
+        self.assertEqual(model.kind, 'a')  # default applied
+        self.assertIsNone(model.note)
+        self.assertEqual(model.extra, 1)
+
+        class CompactItem(SampleItem):
+            class Config:
+                compact = True
+
+        item = CompactItem.construct(code='invalid but trusted', extra=1)
+        self.assertEqual(
+            item.to_json_dict(), {'code': 'invalid but trusted', 'extra': 1}
+        )
+
+        item = CompactItem(code='A')
+        new_item = item.copy(update={'code': 'B', 'label': 'b'})
+        self.assertEqual(item.to_json_dict(), {'code': 'A'})
+        self.assertEqual(new_item.to_json_dict(), {'code': 'B', 'label': 'b'})
+
+        with self.assertRaises(SchemaValidationError) as ctx:
+            model.copy(update={'age': -1})
+        self.assertEqual(ctx.exception.position, ['age'])
+
+    def test_parse_many(self):
+        values = [
+            {'name': 'toki', 'age': 30},
+            SampleModel(name='kan', age=1),
+            {'name': 'x', 'age': 30},
+            {'name': 'toki', 'age': -1},
+        ]
+
+        items = SampleModel.parse_many(values[:2])
+        self.assertEqual(
+            items[0].to_json_dict(), SampleModel(**values[0]).to_json_dict()
+        )
+        self.assertIs(items[1], values[1])
+
+        with self.assertRaises(SchemaValidationError) as cm:
+            SampleModel.parse_many(values)
+        self.assertEqual(cm.exception.position, [2, 'name'])
+
+        items, errors = SampleModel.parse_many(values, collect_errors=10)
+        self.assertEqual(items[2:], [None, None])
+        self.assertEqual([e.position for e in errors], [[2, 'name'], [3, 'age']])
+
+        items, errors = SampleModel.parse_many(values, collect_errors=1)
+        self.assertEqual(len(items), 3)
+        self.assertEqual(len(errors), 1)
+
+        # array of objects goes through parse_many with the same positions
+        with self.assertRaises(SchemaValidationError) as cm:
+            SampleModel(name='toki', age=1, items=[{'code': 'A'}, {'code': 'a'}])
+        self.assertEqual(cm.exception.position, ['items', 1, 'code'])
+
+        with self.assertRaises(SchemaValidationError) as cm:
+            SampleModel(name='toki', age=1, items=[{'code': 'A'}, None])
+        self.assertEqual(cm.exception.position, ['items', 1])
+        self.assertEqual(cm.exception.err_type, 'FIELD_IS_REQUIRED')
+
+
+class TestArrayField(SimpleTestCase):
+    def assert_errors(self, field, value, expected):
+        with self.assertRaises(SchemaValidationError) as cm:
+            field.parse(value, ['body'])
+
+        self.assertEqual(
+            [(e.position, e.err_type) for e in cm.exception.flatten()], expected
+        )
+
+    def test_max_errors(self):
+        field = ArrayField(NumberField(gte=0), max_errors=2)
+        self.assert_errors(
+            field,
+            [1, -1, 2, -2, -3],
+            [
+                (['body', 1], 'VALUE_MUST_GREATER_EQUAL_THAN'),
+                (['body', 3], 'VALUE_MUST_GREATER_EQUAL_THAN'),
+            ],
+        )
+        self.assert_errors(
+            field, [1, -1], [(['body', 1], 'VALUE_MUST_GREATER_EQUAL_THAN')]
+        )
+
+        field = ArrayField(ObjectField(SampleItem), max_errors=5)
+        self.assert_errors(
+            field,
+            [{'code': 'a'}, {'code': 'A'}, {}],
+            [
+                (['body', 0, 'code'], 'REGEX_NOT_MATCH'),
+                (['body', 2, 'code'], 'FIELD_IS_REQUIRED'),
+            ],
+        )
+
+    @skipIf(ndarray_type is None, 'numpy is not installed')
+    def test_vectorized(self):
+        item_field = NumberField(gt=0, lte=100, multiple_of=0.5, enums=None)
+        vectorized = ArrayField(item_field, max_errors=3)
+        values = [1, 2.5, 100, True] * VECTORIZE_MIN_ITEMS
+        self.assertEqual(vectorized.parse(values, []), values)
+
+        invalid_values = list(values)
+        invalid_values[3] = 0
+        invalid_values[7] = 0.3
+        invalid_values[9] = 101
+        invalid_values[11] = -1
+        self.assert_errors(
+            vectorized,
+            invalid_values,
+            [
+                (['body', idx], item_field_error)
+                for idx, item_field_error in (
+                    (3, 'VALUE_MUST_GREATER_THAN'),
+                    (7, 'VALUE_NOT_MUTLIPLE_OF'),
+                    (9, 'VALUE_MUST_LESSER_EQUAL_THAN'),
+                )
+            ],
+        )
+
+        # values or constraints numpy can't compare exactly fall back as well
+        big = 2**60 + 1
+        for field, values in (
+            (ArrayField(NumberField(lte=2**60)), [big, 0.5]),
+            (ArrayField(NumberField(multiple_of=2**65)), [3]),
+        ):
+            for n in (1, VECTORIZE_MIN_ITEMS):
+                with self.assertRaises(SchemaValidationError):
+                    field.parse(values * n, [])
+
+        # not numeric arrays fall back to parse items one by one
+        invalid_values[7] = None
+        self.assert_errors(
+            vectorized,
+            invalid_values,
+            [
+                (['body', 3], 'VALUE_MUST_GREATER_THAN'),
+                (['body', 7], 'FIELD_IS_REQUIRED'),
+                (['body', 9], 'VALUE_MUST_LESSER_EQUAL_THAN'),
+            ],
+        )
+
+        value = ArrayField(item_field, as_ndarray=True).parse(['1', 2], [])
+        self.assertIsInstance(value, ndarray_type)
+        self.assertEqual(to_json_value(value), [1, 2])
+
+    def test_check_unique_items(self):
+        def assert_non_unique_at(field, value, idx):
+            with self.assertRaises(SchemaValidationError) as cm:
+                field.parse(value, [])
+            self.assertEqual(cm.exception.err_type, 'ARRAY_HAS_NON_UNIQUE_ITEM')
+            self.assertEqual(cm.exception.position, [idx])
+
+        field = ArrayField(NumberField(), check_unique_items=True)
+        self.assertEqual(field.parse([1, '2', True], []), [1, 2, True])
+        assert_non_unique_at(field, [1, '1'], 1)
+
+        field = ArrayField(ObjectField(SampleItem), check_unique_items=True)
+        self.assertEqual(len(field.parse([{'code': 'A'}, {'code': 'B'}], [])), 2)
+        assert_non_unique_at(field, [{'code': 'A'}, {'code': 'B'}, {'code': 'A'}], 2)
+
+        field = ArrayField(ArrayField(NumberField()), check_unique_items=True)
+        self.assertEqual(field.parse([[1, 2], [2, 1]], []), [[1, 2], [2, 1]])
+        assert_non_unique_at(field, [[1, 2], [1.0, 2]], 1)
+
+
+class ClickEvent(BaseModel):
+    type = StringField(enums=['click'])
+    x = NumberField()
+
+
+class ViewEvent(BaseModel):
+    type = StringField(enums=['view', 'open'])
+    page = StringField()
+
+
+class TestUnionField(SimpleTestCase):
+    def setUp(self):
+        self.field = UnionField(
+            'type', {'click': ClickEvent, 'view': ViewEvent, 'open': ViewEvent}
+        )
+
+    def assert_error(self, value, err_type, position):
+        with self.assertRaises(SchemaValidationError) as cm:
+            self.field.parse(value, ['event'])
+        self.assertEqual(cm.exception.err_type, err_type)
+        self.assertEqual(cm.exception.position, position)
+
+    def test_parse(self):
+        value = self.field.parse({'type': 'click', 'x': '1'}, [])
+        self.assertIsInstance(value, ClickEvent)
+        self.assertEqual(value.x, 1)
+        self.assertIsInstance(
+            self.field.parse({'type': 'open', 'page': 'a'}, []), ViewEvent
+        )
+        self.assertIs(self.field.parse(value, []), value)
+
+        self.assert_error([], 'TYPE_MISMATCH', ['event'])
+        self.assert_error({'x': 1}, 'FIELD_IS_REQUIRED', ['event', 'type'])
+        self.assert_error({'type': 'drag'}, 'VALUE_NOT_IN_ENUM', ['event', 'type'])
+        self.assert_error({'type': ['click']}, 'VALUE_NOT_IN_ENUM', ['event', 'type'])
+        self.assert_error({'type': 'view'}, 'FIELD_IS_REQUIRED', ['event', 'page'])
+
+    def test_json_schema(self):
+        schema_d = self.field.get_json_schema()
+        click_ref = '#/components/schemas/' + ClickEvent.get_json_schema_ref()
+        view_ref = '#/components/schemas/' + ViewEvent.get_json_schema_ref()
+        self.assertEqual(schema_d['oneOf'], [{'$ref': click_ref}, {'$ref': view_ref}])
+        self.assertEqual(
+            schema_d['discriminator'],
+            {
+                'propertyName': 'type',
+                'mapping': {'click': click_ref, 'view': view_ref, 'open': view_ref},
+            },
+        )
+
+
+class EventLog(BaseModel):
+    id = UUIDField()
+    at = DateTimeField()
+    day = DateField(required=False)
+    amount = DecimalField(required=False)
+
+
+class TestFormatFields(SimpleTestCase):
+    def test_parse(self):
+        log = EventLog(
+            id='0A2B3C4D-0000-1111-2222-333344445555',
+            at='2020-01-02T03:04:05Z',
+            day='2020-01-02',
+            amount=0.1,
+        )
+        self.assertEqual(log.id, UUID('0a2b3c4d-0000-1111-2222-333344445555'))
+        self.assertEqual(log.at, datetime(2020, 1, 2, 3, 4, 5, tzinfo=utc))
+        self.assertEqual(log.day, date(2020, 1, 2))
+        self.assertEqual(log.amount, Decimal('0.1'))
+
+        self.assertEqual(
+            log.to_json_dict(),
+            {
+                'id': '0a2b3c4d-0000-1111-2222-333344445555',
+                'at': '2020-01-02T03:04:05Z',
+                'day': '2020-01-02',
+                'amount': '0.1',
+            },
+        )
+        # same text as DjangoJSONEncoder of JsonResponse
+        self.assertEqual(
+            to_json_value({'at': datetime(2020, 1, 1, 0, 0, 0, 123456, tzinfo=utc)}),
+            {'at': '2020-01-01T00:00:00.123Z'},
+        )
+
+        for name, field, value in (
+            ('id', UUIDField(), 'not-a-uuid'),
+            ('id', UUIDField(), 'x' * 32),
+            ('at', DateTimeField(), '2020-13-01T00:00:00'),
+            ('day', DateField(), 20200102),
+            ('amount', DecimalField(), 'NaN'),
+            ('amount', DecimalField(), True),
+        ):
+            with self.assertRaises(SchemaValidationError) as cm:
+                field.parse(value, [name])
+            self.assertEqual(cm.exception.err_type, 'TYPE_MISMATCH')
+            self.assertEqual(cm.exception.constraint, field.str_format)
+
+    def test_abstract_base(self):
+        with self.assertRaises(TypeError):
+            BaseFormatField()
+
+    def test_json_schema(self):
+        self.assertEqual(
+            {
+                name: field.get_json_schema()['format']
+                for name, field in EventLog.iter_schema_fields()
+            },
+            {'id': 'uuid', 'at': 'date-time', 'day': 'date', 'amount': 'decimal'},
+        )
+
+
+class TestIntegerField(SimpleTestCase):
+    def test_parse(self):
+        field = IntegerField(gte=0, multiple_of=2, int_format='int64')
+        self.assertEqual(field.parse('123456789012345678', []), 123456789012345678)
+        self.assertEqual(field.parse(4.0, []), 4)
+        self.assertIs(type(field.parse(4.0, [])), int)
+        self.assertEqual(field.parse('4.0', []), 4)
+        self.assertEqual(field.parse('123456789012345678.0', []), 123456789012345678)
+
+        for value, err_type, constraint in (
+            ('4.5', 'TYPE_MISMATCH', 'integer'),
+            ('1e5000', 'TYPE_MISMATCH', 'integer'),
+            ('NaN', 'TYPE_MISMATCH', 'integer'),
+            (4.5, 'TYPE_MISMATCH', 'integer'),
+            (True, 'TYPE_MISMATCH', 'integer'),
+            (2**63, 'VALUE_MUST_LESSER_EQUAL_THAN', 2**63 - 1),
+            (-2, 'VALUE_MUST_GREATER_EQUAL_THAN', 0),
+            (3, 'VALUE_NOT_MUTLIPLE_OF', 2),
+        ):
+            with self.assertRaises(SchemaValidationError) as cm:
+                field.parse(value, [])
+            self.assertEqual(cm.exception.err_type, err_type)
+            self.assertEqual(cm.exception.constraint, constraint)
+
+        self.assertEqual(
+            field.get_json_schema(),
+            {'type': 'integer', 'format': 'int64', 'minimum': 0},
+        )
+
+    def test_compiled_validator(self):
+        class Counter(BaseModel):
+            count = IntegerField(lt=10, int_format='int32')
+
+        self.assertEqual(Counter(count='3').count, 3)
+        for value in (True, 10, 2**31, 'x'):
+            with self.assertRaises(SchemaValidationError) as cm:
+                Counter(count=value)
+            with self.assertRaises(SchemaValidationError) as generic_cm:
+                generic_validate(Counter, {'count': value})
+            self.assertEqual(repr(cm.exception), repr(generic_cm.exception))
+
+    @skipIf(ndarray_type is None, 'numpy is not installed')
+    def test_vectorized(self):
+        field = ArrayField(IntegerField(gte=0, int_format='int32'), max_errors=2)
+        values = [1, 2**31, 3, True] * VECTORIZE_MIN_ITEMS
+        with self.assertRaises(SchemaValidationError) as cm:
+            field.parse(values, [])
+        self.assertEqual(
+            [(e.position, e.err_type) for e in cm.exception.flatten()],
+            [([1], 'VALUE_MUST_LESSER_EQUAL_THAN'), ([3], 'TYPE_MISMATCH')],
+        )
+        self.assertEqual(
+            field.parse(values[:1] * VECTORIZE_MIN_ITEMS, []), [1] * VECTORIZE_MIN_ITEMS
+        )
+
+
+class LazySampleItem(SampleItem):
+    class Config:
+        lazy = True
+
+
+class LazySampleModel(SampleModel):
+    class Config:
+        lazy = True
+
+    item = ObjectField(LazySampleItem, required=False)
+    items = ArrayField(ObjectField(LazySampleItem), required=False)
+
+
+class TestLazyModel(SimpleTestCase):
+    def test_deferred_fields(self):
+        obj = LazySampleModel(
+            name='toki', age=30, item={'code': 'A'}, items=[{'code': 'a'}]
+        )
+        lazy_state = obj.__dict__['__lazy_state__']
+        self.assertEqual(sorted(lazy_state.raw_map), ['item', 'items'])
+
+        self.assertIsInstance(LazySampleModel.item, ObjectField)
+        self.assertEqual(obj.item.code, 'A')
+        lazy_state = obj.__dict__['__lazy_state__']
+        self.assertEqual(list(lazy_state.raw_map), ['items'])
+
+        with self.assertRaises(DeferredSchemaValidationError) as cm:
+            obj.items[0].code
+        self.assertEqual(cm.exception.position, ['items', 0, 'code'])
+
+        obj.items = []
+        self.assertEqual(obj.items, [])
+        self.assertNotIn('__lazy_state__', obj.__dict__)
+
+    def test_assign_before_access(self):
+        obj = LazySampleModel(name='toki', age=30, items=[{'code': 'a'}])
+        obj.items = []
+        self.assertEqual(obj.to_json_dict()['items'], [])
+
+        obj = LazySampleModel(name='toki', age=30, items=[{'code': 'A'}])
+        del obj.items
+        self.assertNotIn('items', obj.to_json_dict())
+
+    def test_shallow_copy(self):
+        obj = LazySampleModel(
+            name='toki', age=30, item={'code': 'A'}, items=[{'code': 'B'}]
+        )
+        copied = copy.copy(obj)
+        self.assertEqual(obj.items[0].code, 'B')
+        self.assertEqual(copied.items[0].code, 'B')
+        self.assertEqual(copied.item.code, 'A')
+        self.assertEqual(obj.item.code, 'A')
+
+    def test_same_errors_as_eager(self):
+        for kwargs in (
+            {'name': 'toki', 'age': 1},
+            {'age': 1, 'item': {'code': 'A'}},
+            {'name': 'toki', 'age': 1, 'item': []},
+            {'name': 'toki', 'age': 1, 'item': {'code': 'a'}},
+            {'name': 'toki', 'age': 1, 'items': 'A'},
+            {'name': 'toki', 'age': 1, 'items': [{'code': 'A'}, {}]},
+        ):
+            try:
+                expected = SampleModel(**kwargs).to_json_dict()
+            except SchemaValidationError as e:
+                expected = repr(e)
+
+            try:
+                actual = LazySampleModel(**kwargs).to_json_dict()
+            except DeferredSchemaValidationError as e:
+                actual = repr(e.error)
+            except SchemaValidationError as e:
+                actual = repr(e)
+
+            self.assertEqual(actual, expected)
+
+    def test_reserved_name(self):
+        with self.assertRaises(SchemaValidationError) as cm:
+            LazySampleModel(name='toki', age=1, __lazy_state__=1)
+        self.assertEqual(cm.exception.err_type, 'ADDITIONAL_PROPERTY_NOT_ALLOWED')